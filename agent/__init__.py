@@ -1 +1,5 @@
 """Agent package."""
+
+from .multiproc import prepare_multiprocess_metrics
+
+prepare_multiprocess_metrics()
@@ -0,0 +1,26 @@
+from functools import lru_cache
+
+from shared.ratelimit import RateLimiter
+
+from .config import get_settings
+from .metrics import SPEAK_SHED
+
+
+@lru_cache(maxsize=1)
+def get_speak_limiter() -> RateLimiter:
+    # Shared by every job in this process; buckets are keyed by room name.
+    settings = get_settings()
+    return RateLimiter(
+        rate=settings.speak_rate_per_room,
+        burst=settings.speak_burst_per_room,
+        global_rate=settings.speak_rate_global,
+        global_burst=settings.speak_burst_global,
+    )
+
+
+def admit_speak(room_name: str) -> bool:
+    _, scope = get_speak_limiter().check(room_name)
+    if scope is None:
+        return True
+    SPEAK_SHED.labels(scope).inc()
+    return False
@@ -17,8 +17,47 @@ class Settings:
     tavus_api_key: str
     tavus_replica_id: str
     tavus_persona_id: str
+    tts_cache_memory_bytes: int
+    tts_cache_dir: str | None
+    tts_cache_disk_bytes: int
+    max_text_length: int
+    speech_chunk_chars: int
+    speech_lookahead: int
+    speech_policy: str
+    speech_queue_size: int
+    metrics_host: str
+    metrics_port: int
+    tts_keepalive_interval: float
+    tts_warmup_text: str
+    tavus_start_deadline: float
+    avatar_start_budget: float
+    ingest_mode: str
+    ingest_socket_dir: str
+    ingest_host: str
+    speak_rate_per_room: float
+    speak_burst_per_room: float
+    speak_rate_global: float
+    speak_burst_global: float
+    worker_load_threshold: float
+    max_rooms_per_worker: int
+    max_inflight_tts: int
+    max_loop_lag: float
+    load_dir: str
+    load_report_interval: float
+    job_executor: str
+    tts_hedge_after: float
+    tts_fallback_model: str | None
+    tts_fallback_voice: str | None
+    tts_failover_errors: int
+    tts_failover_cooldown: float
+    tts_max_clients: int
+    tts_models: tuple[str, ...]
+    tts_voices: tuple[str, ...]
 
 
+INGEST_MODES = ("off", "unix", "tcp")
+JOB_EXECUTORS = ("process", "thread")
+
 REQUIRED_ENV_VARS = [
     "LIVEKIT_URL",
     "LIVEKIT_API_KEY",
@@ -38,6 +77,38 @@ def _require_env(name: str) -> str:
     return value
 
 
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError as exc:
+        raise RuntimeError(f"Environment variable {name} must be an integer") from exc
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError as exc:
+        raise RuntimeError(f"Environment variable {name} must be a number") from exc
+
+
+def _env_list(name: str) -> tuple[str, ...]:
+    value = os.getenv(name) or ""
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+def _env_choice(name: str, default: str, choices: tuple[str, ...]) -> str:
+    value = (os.getenv(name) or default).strip().lower()
+    if value not in choices:
+        raise RuntimeError(f"Environment variable {name} must be one of: {', '.join(choices)}")
+    return value
+
+
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
     load_dotenv()
@@ -52,4 +123,40 @@ def get_settings() -> Settings:
         tavus_api_key=_require_env("TAVUS_API_KEY"),
         tavus_replica_id=_require_env("TAVUS_REPLICA_ID"),
         tavus_persona_id=_require_env("TAVUS_PERSONA_ID"),
+        tts_cache_memory_bytes=_env_int("TTS_CACHE_MEMORY_BYTES", 64 * 1024 * 1024),
+        tts_cache_dir=os.getenv("TTS_CACHE_DIR") or None,
+        tts_cache_disk_bytes=_env_int("TTS_CACHE_DISK_BYTES", 1024 * 1024 * 1024),
+        max_text_length=_env_int("MAX_TEXT_LENGTH", 5000),
+        speech_chunk_chars=_env_int("SPEECH_CHUNK_CHARS", 200),
+        speech_lookahead=_env_int("SPEECH_LOOKAHEAD", 2),
+        speech_policy=os.getenv("SPEECH_POLICY", "interrupt"),
+        speech_queue_size=_env_int("SPEECH_QUEUE_SIZE", 8),
+        metrics_host=os.getenv("AGENT_METRICS_HOST", "0.0.0.0"),
+        metrics_port=_env_int("AGENT_METRICS_PORT", 0),
+        tts_keepalive_interval=_env_float("TTS_KEEPALIVE_INTERVAL", 30.0),
+        tts_warmup_text=os.getenv("TTS_WARMUP_TEXT", ""),
+        tavus_start_deadline=_env_float("TAVUS_START_DEADLINE", 15.0),
+        avatar_start_budget=_env_float("AVATAR_START_BUDGET", 0.0),
+        ingest_mode=_env_choice("AGENT_INGEST_MODE", "off", INGEST_MODES),
+        ingest_socket_dir=os.getenv("AGENT_INGEST_SOCKET_DIR", "/tmp/agent-ingest"),
+        ingest_host=os.getenv("AGENT_INGEST_HOST", "127.0.0.1"),
+        speak_rate_per_room=_env_float("AGENT_SPEAK_RATE_PER_ROOM", 0.0),
+        speak_burst_per_room=_env_float("AGENT_SPEAK_BURST_PER_ROOM", 5.0),
+        speak_rate_global=_env_float("AGENT_SPEAK_RATE_GLOBAL", 0.0),
+        speak_burst_global=_env_float("AGENT_SPEAK_BURST_GLOBAL", 50.0),
+        worker_load_threshold=_env_float("WORKER_LOAD_THRESHOLD", 0.75),
+        max_rooms_per_worker=_env_int("MAX_ROOMS_PER_WORKER", 0),
+        max_inflight_tts=_env_int("MAX_INFLIGHT_TTS", 32),
+        max_loop_lag=_env_float("MAX_LOOP_LAG", 0.2),
+        load_dir=os.getenv("AGENT_LOAD_DIR", "/tmp/agent-load"),
+        load_report_interval=_env_float("LOAD_REPORT_INTERVAL", 1.0),
+        job_executor=_env_choice("AGENT_JOB_EXECUTOR", "process", JOB_EXECUTORS),
+        tts_hedge_after=_env_float("TTS_HEDGE_AFTER", 0.0),
+        tts_fallback_model=os.getenv("TTS_FALLBACK_MODEL") or None,
+        tts_fallback_voice=os.getenv("TTS_FALLBACK_VOICE") or None,
+        tts_failover_errors=_env_int("TTS_FAILOVER_ERRORS", 3),
+        tts_failover_cooldown=_env_float("TTS_FAILOVER_COOLDOWN", 30.0),
+        tts_max_clients=_env_int("TTS_MAX_CLIENTS", 8),
+        tts_models=_env_list("TTS_MODELS"),
+        tts_voices=_env_list("TTS_VOICES"),
     )
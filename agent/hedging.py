@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable
+
+from livekit import rtc
+
+from .config import Settings
+from .metrics import TTS_HEDGE_EVENTS
+from .prewarm import build_fallback_tts
+from .tts_cache import synthesize_frames
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+@dataclass
+class HedgeStats:
+    requests: int = 0
+    hedged: int = 0
+    first_wins: int = 0
+    hedge_wins: int = 0
+    errors: int = 0
+    failovers: int = 0
+
+
+@dataclass
+class _SynthesizedAudio:
+    frame: rtc.AudioFrame
+
+
+class _Attempt:
+    def __init__(self, name: str, tts: Any, text: str, changed: asyncio.Event) -> None:
+        self.name = name
+        self.ready = False
+        self.error: BaseException | None = None
+        self.reported = False
+        self.frames: asyncio.Queue[Any] = asyncio.Queue()
+        self._changed = changed
+        self.task = asyncio.create_task(self._run(tts, text))
+
+    async def _run(self, tts: Any, text: str) -> None:
+        try:
+            async for frame in synthesize_frames(tts, text):
+                self.frames.put_nowait(frame)
+                if not self.ready:
+                    self.ready = True
+                    self._changed.set()
+        except Exception as exc:
+            self.error = exc
+        else:
+            # An empty stream counts as ready: there is simply nothing to play.
+            self.ready = True
+        finally:
+            self.frames.put_nowait(_END)
+            self._changed.set()
+
+
+class HedgedTTS:
+    def __init__(
+        self,
+        primary: Any,
+        fallback: Any = None,
+        hedge_after: float = 0.0,
+        failover_errors: int = 3,
+        failover_cooldown: float = 30.0,
+    ) -> None:
+        # Without a fallback provider the hedge is a second request to the primary.
+        self.primary = primary
+        self.fallback = fallback
+        self.hedge_after = hedge_after
+        self.failover_errors = failover_errors
+        self.failover_cooldown = failover_cooldown
+        self.stats = HedgeStats()
+        self._consecutive_errors = 0
+        self._failed_over_until = 0.0
+
+    def synthesize(self, text: str) -> "_HedgedStream":
+        return _HedgedStream(self, text)
+
+    async def aclose(self) -> None:
+        for tts in (self.primary, self.fallback):
+            close = getattr(tts, "aclose", None)
+            if callable(close):
+                await close()
+
+    def _providers(self) -> list[tuple[str, Any]]:
+        primary = ("primary", self.primary)
+        fallback = ("fallback", self.fallback) if self.fallback is not None else primary
+        # After repeated primary errors the fallback leads and the primary becomes the hedge.
+        if self.fallback is not None and time.monotonic() < self._failed_over_until:
+            return [fallback, primary]
+        return [primary, fallback]
+
+    def _count(self, name: str) -> None:
+        setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def _record_error(self, name: str, exc: BaseException) -> None:
+        logger.warning("tts %s synthesis failed: %s", name, exc)
+        self._count("errors")
+        TTS_HEDGE_EVENTS.labels("error").inc()
+        if name != "primary" or self.fallback is None or self.failover_errors <= 0:
+            return
+        self._consecutive_errors += 1
+        if self._consecutive_errors < self.failover_errors:
+            return
+        self._consecutive_errors = 0
+        self._failed_over_until = time.monotonic() + self.failover_cooldown
+        self.stats.failovers += 1
+        TTS_HEDGE_EVENTS.labels("failover").inc()
+        logger.warning("tts failing over to the fallback provider for %.0fs", self.failover_cooldown)
+
+    def _record_success(self, name: str) -> None:
+        if name == "primary":
+            self._consecutive_errors = 0
+
+    async def frames(
+        self,
+        text: str,
+        on_winner: Callable[[str], None] | None = None,
+    ) -> AsyncIterator[rtc.AudioFrame]:
+        self._count("requests")
+        providers = self._providers()
+        changed = asyncio.Event()
+        first = _Attempt(*providers[0], text, changed)
+        attempts = [first]
+        hedge_at = time.monotonic() + self.hedge_after if self.hedge_after > 0 else None
+        try:
+            winner = await self._race(attempts, providers[1], text, changed, hedge_at)
+            for attempt in attempts:
+                if attempt is not winner:
+                    attempt.task.cancel()
+            if on_winner is not None:
+                on_winner(winner.name)
+            hedge_won = winner is not first
+            self._count("hedge_wins" if hedge_won else "first_wins")
+            TTS_HEDGE_EVENTS.labels("hedge_won" if hedge_won else "first_won").inc()
+
+            while True:
+                frame = await winner.frames.get()
+                if frame is _END:
+                    break
+                yield frame
+            if winner.error is not None:
+                self._record_error(winner.name, winner.error)
+                raise winner.error
+            self._record_success(winner.name)
+        finally:
+            for attempt in attempts:
+                attempt.task.cancel()
+
+    async def _race(
+        self,
+        attempts: list[_Attempt],
+        second: tuple[str, Any],
+        text: str,
+        changed: asyncio.Event,
+        hedge_at: float | None,
+    ) -> _Attempt:
+        hedged = False
+        while True:
+            for attempt in attempts:
+                if attempt.ready:
+                    return attempt
+            for attempt in attempts:
+                if attempt.error is not None and not attempt.reported:
+                    attempt.reported = True
+                    self._record_error(attempt.name, attempt.error)
+            live = [attempt for attempt in attempts if attempt.error is None]
+            if not hedged and (len(live) < len(attempts) or hedge_at is not None and time.monotonic() >= hedge_at):
+                # The first request failed or its audio is late; race a second request against it.
+                event = "retry" if len(live) < len(attempts) else "hedged"
+                attempts.append(_Attempt(*second, text, changed))
+                hedged = True
+                self._count("hedged")
+                TTS_HEDGE_EVENTS.labels(event).inc()
+                continue
+            if not live:
+                raise attempts[-1].error
+            changed.clear()
+            timeout = None if hedged or hedge_at is None else max(0.0, hedge_at - time.monotonic())
+            try:
+                await asyncio.wait_for(changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+class _HedgedStream:
+    # Matches the part of a livekit TTS stream that synthesize_frames() reads.
+    def __init__(self, tts: HedgedTTS, text: str) -> None:
+        self.provider: str | None = None
+        self._frames = tts.frames(text, self._set_provider)
+
+    @property
+    def cacheable(self) -> bool:
+        # The cache key names the primary model and voice; fallback audio must not be stored under it.
+        return self.provider == "primary"
+
+    def _set_provider(self, name: str) -> None:
+        self.provider = name
+
+    async def __aenter__(self) -> "_HedgedStream":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self._frames.aclose()
+
+    def __aiter__(self) -> AsyncIterator[_SynthesizedAudio]:
+        return self._events()
+
+    async def _events(self) -> AsyncIterator[_SynthesizedAudio]:
+        async for frame in self._frames:
+            yield _SynthesizedAudio(frame)
+
+
+def build_hedged_tts(settings: Settings, primary: Any, fallback: Any = None) -> Any:
+    if settings.tts_hedge_after <= 0 and not settings.tts_fallback_model:
+        return primary
+    if fallback is None and settings.tts_fallback_model:
+        fallback = build_fallback_tts(settings)
+    return HedgedTTS(
+        primary,
+        fallback,
+        hedge_after=settings.tts_hedge_after,
+        failover_errors=settings.tts_failover_errors,
+        failover_cooldown=settings.tts_failover_cooldown,
+    )
@@ -0,0 +1,157 @@
+import asyncio
+import contextlib
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+import uvicorn
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, Field
+
+from shared.protocol import SpeakDecoder, SpeakMessage
+
+from .config import Settings
+
+logger = logging.getLogger(__name__)
+
+# Returns whether the message was accepted for playback.
+Deliver = Callable[[SpeakMessage, float], bool]
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+
+class _Server(uvicorn.Server):
+    # The job process owns signal handling; the ingest server only follows the job.
+    @contextlib.contextmanager
+    def capture_signals(self) -> Iterator[None]:
+        yield
+
+
+@dataclass
+class IngestStats:
+    connections: int = 0
+    messages: int = 0
+    accepted: int = 0
+    rejected: int = 0
+
+
+def socket_path(socket_dir: str, room_name: str) -> str:
+    return os.path.join(socket_dir, _UNSAFE_CHARS.sub("_", room_name) + ".sock")
+
+
+def _ack(message: SpeakMessage, accepted: bool) -> dict[str, Any]:
+    ack: dict[str, Any] = {"type": "ack", "accepted": accepted}
+    if message.message_id:
+        ack["messageId"] = message.message_id
+        ack["seq"] = message.seq
+    if "id" in message.options:
+        ack["id"] = message.options["id"]
+    return ack
+
+
+def build_ingest_app(deliver: Deliver, stats: IngestStats, max_text_length: int) -> FastAPI:
+    app = FastAPI()
+
+    class SpeakRequest(BaseModel):
+        text: str = Field(..., min_length=1, max_length=max_text_length)
+        policy: str | None = None
+        model: str | None = Field(default=None, min_length=1, max_length=64)
+        voice: str | None = Field(default=None, min_length=1, max_length=64)
+
+    def handle(message: SpeakMessage, received_at: float) -> bool:
+        stats.messages += 1
+        accepted = deliver(message, received_at)
+        if accepted:
+            stats.accepted += 1
+        else:
+            stats.rejected += 1
+        return accepted
+
+    @app.post("/speak")
+    async def speak(request: SpeakRequest) -> dict[str, bool]:
+        # The same options a data packet carries, so both paths pick the model and voice alike.
+        options = {key: value for key, value in (("model", request.model), ("voice", request.voice)) if value}
+        message = SpeakMessage(text=request.text, policy=request.policy, options=options)
+        return {"ok": handle(message, time.time())}
+
+    @app.websocket("/ws")
+    async def ingest(websocket: WebSocket) -> None:
+        # One connection carries many messages: text frames use the JSON speak format,
+        # binary frames the speak wire protocol. Each decoded message is acknowledged.
+        await websocket.accept()
+        stats.connections += 1
+        decoder = SpeakDecoder()
+        try:
+            while True:
+                frame = await websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    return
+                received_at = time.time()
+                payload = frame.get("bytes")
+                if payload is None:
+                    payload = frame.get("text")
+                message = decoder.decode(payload, "tts")
+                if message is None:
+                    if isinstance(payload, str):
+                        await websocket.send_json({"type": "ack", "accepted": False, "error": "invalid message"})
+                    continue
+                await websocket.send_json(_ack(message, handle(message, received_at)))
+        except WebSocketDisconnect:
+            pass
+
+    return app
+
+
+class IngestServer:
+    def __init__(self, room_name: str, deliver: Deliver, settings: Settings) -> None:
+        self.room_name = room_name
+        self.mode = settings.ingest_mode
+        self.stats = IngestStats()
+        self.url: str | None = None
+        self._socket_dir = settings.ingest_socket_dir
+        self._host = settings.ingest_host
+        self._deliver = deliver
+        self._max_text_length = settings.max_text_length
+        self._path: str | None = None
+        self._server: _Server | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> str:
+        app = build_ingest_app(self._deliver, self.stats, self._max_text_length)
+        if self.mode == "unix":
+            os.makedirs(self._socket_dir, exist_ok=True)
+            self._path = socket_path(self._socket_dir, self.room_name)
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self._path)
+            config = uvicorn.Config(app, uds=self._path, log_level="warning", lifespan="off")
+        else:
+            # Every job gets its own ephemeral port, so rooms never share a listener.
+            config = uvicorn.Config(app, host=self._host, port=0, log_level="warning", lifespan="off")
+        self._server = _Server(config)
+        self._task = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            if self._task.done():
+                self._task.result()
+                raise RuntimeError("ingest server stopped during startup")
+            await asyncio.sleep(0.01)
+        if self._path is not None:
+            self.url = f"unix:{self._path}"
+        else:
+            port = self._server.servers[0].sockets[0].getsockname()[1]
+            self.url = f"ws://{self._host}:{port}/ws"
+        logger.info("Agent ingest for room %s listening on %s", self.room_name, self.url)
+        return self.url
+
+    async def stop(self) -> None:
+        server, task = self._server, self._task
+        self._server = self._task = None
+        if server is not None:
+            server.should_exit = True
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+        if self._path is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self._path)
@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import os
+import shutil
+import struct
+import threading
+import time
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, TypeVar
+
+import psutil
+
+from .config import Settings, get_settings
+from .metrics import PROCESS_RSS_BYTES, ROOMS_IN_PROCESS, WORKER_LOAD
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# updated_at, in-flight syntheses, event-loop lag
+_RECORD = struct.Struct("<dId")
+_SUFFIX = ".load"
+_WORKER_PREFIX = "worker-"
+_WORKER_ENV = "AGENT_LOAD_WORKER"
+STALE_AFTER = 60.0
+MIB = 1024 * 1024
+
+_process = psutil.Process()
+
+
+def process_memory() -> int:
+    return _process.memory_info().rss
+
+
+def worker_load_dir(base: str) -> str:
+    # Every worker on a host gets its own directory. The worker records its pid in the
+    # environment before it starts job processes, and they inherit it.
+    worker = os.environ.setdefault(_WORKER_ENV, str(os.getpid()))
+    return os.path.join(base, f"{_WORKER_PREFIX}{worker}")
+
+
+def _remove_dead_workers(base: str) -> None:
+    try:
+        entries = list(os.scandir(base))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if not entry.name.startswith(_WORKER_PREFIX):
+            continue
+        try:
+            pid = int(entry.name[len(_WORKER_PREFIX) :])
+        except ValueError:
+            continue
+        if not psutil.pid_exists(pid):
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class LoadReporter:
+    def __init__(self, directory: str, interval: float) -> None:
+        self.directory = directory
+        self.interval = max(0.05, interval)
+        self.inflight_tts = 0
+        self.rooms = 0
+        self._lags: dict[asyncio.AbstractEventLoop, float] = {}
+        self._samplers: dict[asyncio.AbstractEventLoop, asyncio.Task[None]] = {}
+        self._lock = threading.Lock()
+        self._fd: int | None = None
+
+    @property
+    def loop_lag(self) -> float:
+        with self._lock:
+            return max(self._lags.values(), default=0.0)
+
+    def start(self) -> None:
+        # Jobs that share a process (thread executor) each run their own event loop, and
+        # each loop gets its own lag sampler.
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sampler = self._samplers.get(loop)
+            if sampler is not None and not sampler.done():
+                return
+            if self._fd is None:
+                try:
+                    os.makedirs(self.directory, exist_ok=True)
+                    path = os.path.join(self.directory, f"{os.getpid()}{_SUFFIX}")
+                    self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+                except OSError:
+                    logger.exception("Failed to open load report in %s", self.directory)
+                    return
+            self._samplers[loop] = loop.create_task(self._sample(loop))
+
+    async def _sample(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            while True:
+                started = time.monotonic()
+                await asyncio.sleep(self.interval)
+                # Anything beyond the requested sleep is time the loop spent busy elsewhere.
+                lag = max(0.0, time.monotonic() - started - self.interval)
+                with self._lock:
+                    self._lags[loop] = max(lag, self._lags.get(loop, 0.0) * 0.5)
+                self.write()
+        finally:
+            with self._lock:
+                self._lags.pop(loop, None)
+                if self._samplers.get(loop) is asyncio.current_task():
+                    del self._samplers[loop]
+
+    def write(self) -> None:
+        if self._fd is None:
+            return
+        record = _RECORD.pack(time.time(), self.inflight_tts, self.loop_lag)
+        PROCESS_RSS_BYTES.set(process_memory())
+        ROOMS_IN_PROCESS.set(self.rooms)
+        try:
+            # One small positional write per interval; readers never see a partial record.
+            os.pwrite(self._fd, record, 0)
+        except OSError:
+            logger.debug("Failed to write load report", exc_info=True)
+
+    def _add(self, name: str, delta: int) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def room_started(self) -> None:
+        self._add("rooms", 1)
+
+    def room_finished(self) -> None:
+        self._add("rooms", -1)
+
+    def memory_summary(self, startup_bytes: int) -> str:
+        rss = process_memory()
+        rooms = max(1, self.rooms)
+        return (
+            f"startup_delta={startup_bytes / MIB:.1f}MiB process_rss={rss / MIB:.1f}MiB "
+            f"rooms_in_process={self.rooms} per_room={rss / rooms / MIB:.1f}MiB"
+        )
+
+    async def track(self, frames: AsyncIterator[T]) -> AsyncIterator[T]:
+        self._add("inflight_tts", 1)
+        try:
+            async with aclosing(frames) as stream:
+                async for frame in stream:
+                    yield frame
+        finally:
+            self._add("inflight_tts", -1)
+
+
+_reporter: LoadReporter | None = None
+
+
+def get_load_reporter() -> LoadReporter:
+    # One reporter per process, shared by every job that runs in it.
+    global _reporter
+    if _reporter is None:
+        settings = get_settings()
+        _reporter = LoadReporter(worker_load_dir(settings.load_dir), settings.load_report_interval)
+    return _reporter
+
+
+@dataclass
+class LoadSample:
+    rooms: int = 0
+    inflight_tts: int = 0
+    loop_lag: float = 0.0
+    cpu: float = 0.0
+    load: float = 0.0
+
+
+def _discard(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def read_reports(directory: str, max_age: float) -> tuple[int, float]:
+    inflight = 0
+    lag = 0.0
+    now = time.time()
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0, 0.0
+    for entry in entries:
+        if not entry.name.endswith(_SUFFIX):
+            continue
+        try:
+            pid = int(entry.name[: -len(_SUFFIX)])
+        except ValueError:
+            continue
+        if not psutil.pid_exists(pid):
+            _discard(entry.path)
+            continue
+        try:
+            with open(entry.path, "rb") as handle:
+                data = handle.read(_RECORD.size)
+        except OSError:
+            continue
+        if len(data) < _RECORD.size:
+            continue
+        updated_at, count, loop_lag = _RECORD.unpack(data)
+        age = now - updated_at
+        if age > STALE_AFTER:
+            _discard(entry.path)
+            continue
+        inflight += count
+        # A live process whose report stopped updating has a blocked event loop.
+        lag = max(lag, loop_lag, age - max_age if age > max_age else 0.0)
+    return inflight, lag
+
+
+class LoadCalculator:
+    def __init__(self, settings: Settings) -> None:
+        self.max_rooms = settings.max_rooms_per_worker
+        self.max_inflight_tts = settings.max_inflight_tts
+        self.max_loop_lag = settings.max_loop_lag
+        self.directory = worker_load_dir(settings.load_dir)
+        self.max_age = settings.load_report_interval * 3
+        self.last = LoadSample()
+        # Directories of workers that exited are left behind; reports from an earlier
+        # process with a reused pid would count against this one.
+        _remove_dead_workers(settings.load_dir)
+        for name in os.listdir(self.directory) if os.path.isdir(self.directory) else ():
+            if name.endswith(_SUFFIX):
+                _discard(os.path.join(self.directory, name))
+        psutil.cpu_percent(interval=None)
+
+    def __call__(self, worker: Any = None) -> float:
+        rooms = len(getattr(worker, "active_jobs", ()) or ())
+        inflight, lag = read_reports(self.directory, self.max_age)
+        cpu = psutil.cpu_percent(interval=None) / 100.0
+        # Each signal is scaled to its configured capacity; the most saturated one wins.
+        parts = [cpu]
+        if self.max_rooms > 0:
+            parts.append(rooms / self.max_rooms)
+        if self.max_inflight_tts > 0:
+            parts.append(inflight / self.max_inflight_tts)
+        if self.max_loop_lag > 0:
+            parts.append(lag / self.max_loop_lag)
+        load = min(1.0, max(parts))
+        self.last = LoadSample(rooms=rooms, inflight_tts=inflight, loop_lag=lag, cpu=cpu, load=load)
+        WORKER_LOAD.labels("load").set(load)
+        WORKER_LOAD.labels("rooms").set(rooms)
+        WORKER_LOAD.labels("inflight_tts").set(inflight)
+        WORKER_LOAD.labels("loop_lag").set(lag)
+        WORKER_LOAD.labels("cpu").set(cpu)
+        return load
@@ -1,23 +1,39 @@
 import asyncio
-import json
 import logging
-import os
 import sys
 import time
-from typing import Any
+from typing import Any, AsyncIterator, Callable
 
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit import rtc
+from livekit.agents import JobContext, JobExecutorType, WorkerOptions, cli
 from livekit.agents.voice.agent import Agent
 from livekit.agents.voice.agent_session import AgentSession
-from livekit.plugins import openai, tavus
 
+from shared.protocol import SpeakDecoder, SpeakMessage
+from shared.text import SentenceBuffer, split_text
+
+from .admission import admit_speak
 from .config import get_settings
+from .hedging import HedgedTTS, build_hedged_tts
+from .ingest import IngestServer
+from .load import LoadCalculator, get_load_reporter, process_memory
+from .metrics import (
+    RECEIVE_TO_SAY_SECONDS,
+    ROOM_STARTUP_MEMORY_BYTES,
+    observe_first_frame,
+    start_metrics_listener,
+)
+from .pipeline import pipelined_frames, split_fragments
+from .prewarm import TTSWarmer, build_fallback_tts, build_tts, prewarm
+from .scheduler import SpeechPolicy, SpeechRequest, SpeechScheduler
+from .startup import StageTimer, build_avatar, start_tavus_with_retry, wait_for_avatar
+from .streaming import StreamRegistry, TextStream
+from .tts_cache import get_tts_cache, synthesize_frames
+from .tts_registry import TTSClientRegistry, TTSKey
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("agent")
 
-MAX_TEXT_LENGTH = 500
-
 
 def _participant_identity(room: Any) -> str | None:
     participant = getattr(room, "local_participant", None)
@@ -27,106 +43,160 @@ def _participant_identity(room: Any) -> str | None:
     return None
 
 
-def _extract_text(payload: bytes | str) -> tuple[str | None, bool]:
-    if isinstance(payload, bytes):
-        try:
-            payload = payload.decode("utf-8")
-        except Exception:
-            return None, False
-    payload = payload.strip()
-    if not payload:
-        return None, False
-    try:
-        data = json.loads(payload)
-    except json.JSONDecodeError:
-        return payload, False
-    if isinstance(data, dict):
-        if data.get("type") == "speak" and isinstance(data.get("text"), str):
-            return data["text"], True
-        if isinstance(data.get("text"), str):
-            return data["text"], False
-    if isinstance(data, str):
-        return data, False
-    return None, False
-
-
 def _now_ts() -> float:
     return time.time()
 
 
-async def _start_tavus_once(agent_session: AgentSession, room: Any) -> tavus.AvatarSession:
-    settings = get_settings()
-    avatar_session = tavus.AvatarSession(
-        replica_id=settings.tavus_replica_id,
-        persona_id=settings.tavus_persona_id,
-        api_key=settings.tavus_api_key,
-        avatar_participant_name="Tavus-avatar",
-        avatar_participant_identity="tavus-avatar",
-    )
-    await avatar_session.start(
-        agent_session=agent_session,
-        room=room,
-        livekit_url=settings.livekit_url,
-        livekit_api_key=settings.livekit_api_key,
-        livekit_api_secret=settings.livekit_api_secret,
-    )
-    return avatar_session
-
-
-async def start_tavus_with_retry(agent_session: AgentSession, room: Any) -> tavus.AvatarSession:
-    delay = 0.5
-    for attempt in range(3):
-        try:
-            session = await _start_tavus_once(agent_session, room)
-            logger.info("tavus avatar started participant=Tavus-avatar")
-            return session
-        except Exception:
-            logger.exception("tavus start failed attempt=%s", attempt + 1)
-            if attempt >= 2:
-                raise
-            await asyncio.sleep(delay)
-            delay *= 2
-    raise RuntimeError("tavus start failed")
+def _tts_options(options: dict[str, Any] | None) -> tuple[Any, Any]:
+    if not options:
+        return None, None
+    return options.get("model"), options.get("voice")
 
 
 async def entrypoint(ctx: JobContext) -> None:
     settings = get_settings()
-    await ctx.connect()
-    identity = _participant_identity(ctx.room)
-    logger.info("connected room=%s identity=%s", ctx.room.name, identity)
+    memory_before = process_memory()
+    userdata = ctx.proc.userdata
+    tts_model = settings.openai_tts_model
+    tts_voice = settings.openai_tts_voice
+    openai_client = userdata.get("openai_client")
+    tts = userdata.get("tts") or build_tts(settings, client=openai_client)
+    # Synthesis may race a second request when the first audio is late; the session keeps the plain client.
+    speech_tts = build_hedged_tts(settings, tts, userdata.get("tts_fallback"))
+    warmer = userdata.get("tts_warmer") or TTSWarmer(openai_client, tts_model, settings.tts_keepalive_interval)
+    tts_cache = get_tts_cache()
+    load_reporter = get_load_reporter()
+    load_reporter.start()
 
-    tts_model = os.getenv("OPENAI_TTS_MODEL", settings.openai_tts_model)
-    tts_voice = os.getenv("OPENAI_TTS_VOICE", settings.openai_tts_voice)
-    session = AgentSession(
-        tts=openai.TTS(
-            model=tts_model,
-            voice=tts_voice,
-        )
+    # Messages may pick their own model and voice; each pair gets one reusable client. Evicted
+    # clients are closed, so they keep their own HTTP clients instead of the shared one.
+    tts_clients = TTSClientRegistry(
+        lambda model, voice: build_hedged_tts(
+            settings, build_tts(settings, model, voice), build_fallback_tts(settings, voice)
+        ),
+        tts_model,
+        tts_voice,
+        speech_tts,
+        max_clients=settings.tts_max_clients,
+        models=settings.tts_models,
+        voices=settings.tts_voices,
     )
 
-    # Start Tavus before first speech so avatar tracks are ready.
-    await start_tavus_with_retry(session, ctx.room)
+    def synthesizer(key: TTSKey) -> Callable[[str], AsyncIterator[rtc.AudioFrame]]:
+        def synthesize(chunk: str) -> AsyncIterator[rtc.AudioFrame]:
+            return load_reporter.track(tts_clients.frames(key, chunk, tts_cache))
 
+        return synthesize
+
+    timer = StageTimer()
+    # Open the provider connection while the room connects. The warmup skips the cache:
+    # a cached utterance would make no provider request and leave the connection cold.
+    warmer.warmup(lambda text: load_reporter.track(synthesize_frames(tts, text)), settings.tts_warmup_text)
+    warmer.start_keepalive()
+    connect = asyncio.create_task(timer.run("connect", ctx.connect()))
+
+    session = AgentSession(tts=tts)
     agent = Agent(instructions="You are a realtime TTS agent. Speak the provided text verbatim.")
-    await session.start(agent=agent, room=ctx.room, record=False)
+    avatar = build_avatar(settings)
+    default_policy = SpeechPolicy.parse(settings.speech_policy, SpeechPolicy.INTERRUPT)
 
-    speak_lock = asyncio.Lock()
+    streams = StreamRegistry()
 
-    async def speak_text(text: str, received_at: float) -> None:
+    async def play(request: SpeechRequest) -> None:
+        said_at = _now_ts()
+        RECEIVE_TO_SAY_SECONDS.observe(max(0.0, said_at - request.received_at))
+        if request.stream is not None:
+            # Streamed text is spoken while it is still arriving: each fragment is split
+            # and synthesized as soon as it lands.
+            logger.info(
+                "say() called at %.3f stream=%s policy=%s",
+                said_at,
+                request.stream.stream_id,
+                request.policy.value,
+            )
+            chunks = split_fragments(request.stream.fragments(), settings.speech_chunk_chars)
+            text = request.stream.fragments()
+        else:
+            chunks = split_text(request.text, settings.speech_chunk_chars)
+            logger.info("say() called at %.3f chunks=%s policy=%s", said_at, len(chunks), request.policy.value)
+            text = request.text
+        key = (request.model, request.voice) if request.model and request.voice else tts_clients.default
+        audio = pipelined_frames(chunks, synthesizer(key), settings.speech_lookahead)
+        handle = session.say(text, audio=observe_first_frame(audio, time.perf_counter()))
+        try:
+            await handle.wait_for_playout()
+        finally:
+            if request.stream is not None:
+                request.stream.finish()
+                streams.release(request.stream)
+
+    # Requests queue here until the session can speak; the scheduler starts after startup.
+    scheduler = SpeechScheduler(play=play, interrupt=session.interrupt, max_queue=settings.speech_queue_size)
+
+    def speak_text(text: str, policy: str | None, received_at: float, options: dict[str, Any] | None = None) -> bool:
         cleaned = text.strip()
         if not cleaned:
-            return
-        if len(cleaned) > MAX_TEXT_LENGTH:
-            logger.warning("Ignoring text longer than %s chars", MAX_TEXT_LENGTH)
-            return
+            return False
+        if len(cleaned) > settings.max_text_length:
+            logger.warning("Ignoring text longer than %s chars", settings.max_text_length)
+            return False
+        if not admit_speak(ctx.room.name):
+            logger.warning("Shedding speak text over the rate limit: %s", cleaned)
+            return False
         logger.info("text received at %.3f: %s", received_at, cleaned)
-        async with speak_lock:
-            try:
-                await session.interrupt()
-            except Exception:
-                logger.exception("Failed to interrupt current speech")
-            logger.info("say() called at %.3f", _now_ts())
-            session.say(cleaned)
+        model, voice = tts_clients.resolve(*_tts_options(options))
+        return scheduler.submit(
+            SpeechRequest(
+                text=cleaned,
+                policy=SpeechPolicy.parse(policy, default_policy),
+                received_at=received_at,
+                model=model,
+                voice=voice,
+            )
+        )
+
+    def speak_stream(
+        stream: TextStream,
+        policy: str | None,
+        received_at: float,
+        options: dict[str, Any] | None = None,
+    ) -> bool:
+        if not admit_speak(ctx.room.name):
+            logger.warning("Shedding text stream %s over the rate limit", stream.stream_id)
+            return False
+        logger.info("text stream %s opened at %.3f", stream.stream_id, received_at)
+        model, voice = tts_clients.resolve(*_tts_options(options))
+        return scheduler.submit(
+            SpeechRequest(
+                text="",
+                policy=SpeechPolicy.parse(policy, default_policy),
+                received_at=received_at,
+                stream=stream,
+                model=model,
+                voice=voice,
+            )
+        )
+
+    def on_stream_fragment(message: SpeakMessage, received_at: float) -> bool:
+        stream, created = streams.open(message.message_id)
+        if stream is None:
+            return False
+        if created and not speak_stream(stream, message.policy, received_at, message.options):
+            # Later fragments of a rejected stream are dropped as well.
+            stream.finish()
+            streams.release(stream)
+            return False
+        stream.push(message.seq, message.text, message.end)
+        streams.release(stream)
+        return True
+
+    def deliver(message: SpeakMessage, received_at: float) -> bool:
+        # Data packets and the local ingest share one path into the scheduler.
+        if message.stream:
+            return on_stream_fragment(message, received_at)
+        return speak_text(message.text, message.policy, received_at, message.options)
+
+    decoder = SpeakDecoder()
 
     def on_data_received(*args: Any, **kwargs: Any) -> None:
         topic = kwargs.get("topic")
@@ -144,32 +214,127 @@ async def entrypoint(ctx: JobContext) -> None:
                 data = first
         if topic is None and len(args) >= 4:
             topic = args[3]
-        text, is_speak_type = _extract_text(data)
-        if not text:
-            return
-        if topic != "tts" and not is_speak_type:
+        message = decoder.decode(data, topic)
+        if message is not None:
+            deliver(message, _now_ts())
+
+    text_stream_tasks: set[asyncio.Task[None]] = set()
+
+    async def read_text_stream(reader: Any, participant_identity: str) -> None:
+        # Participant text streams on the "tts" topic are spoken sentence by sentence.
+        stream = TextStream(id(reader))
+        if not speak_stream(stream, None, _now_ts()):
             return
-        asyncio.create_task(speak_text(text, _now_ts()))
+        sentences = SentenceBuffer(settings.speech_chunk_chars)
+        try:
+            async for chunk in reader:
+                for sentence in sentences.push(chunk):
+                    stream.append(sentence)
+            tail = sentences.flush()
+            if tail:
+                stream.append(tail)
+        except Exception:
+            logger.exception("Text stream from %s failed", participant_identity)
+        finally:
+            stream.finish()
+
+    def on_text_stream(reader: Any, participant_identity: str) -> None:
+        task = asyncio.create_task(read_text_stream(reader, participant_identity))
+        text_stream_tasks.add(task)
+        task.add_done_callback(text_stream_tasks.discard)
 
     try:
         ctx.room.on("data_received", on_data_received)
         logger.info("listening for LiveKit data messages")
     except Exception:
         logger.exception("failed to subscribe to data messages")
+    try:
+        ctx.room.register_text_stream_handler("tts", on_text_stream)
+    except Exception:
+        logger.exception("failed to register text stream handler")
+
+    await connect
+    identity = _participant_identity(ctx.room)
+    logger.info("connected room=%s identity=%s", ctx.room.name, identity)
+
+    # The avatar participant joins while the agent session starts. Until it is ready the
+    # session speaks through its own room audio track; the avatar's audio output takes
+    # over for the next utterance once avatar start completes.
+    tavus_deadline = time.monotonic() + settings.tavus_start_deadline
+    avatar_task = asyncio.create_task(
+        timer.run("tavus", start_tavus_with_retry(session, ctx.room, tavus_deadline, avatar))
+    )
+    try:
+        await timer.run("session", session.start(agent=agent, room=ctx.room, record=False))
+        await wait_for_avatar(avatar_task, settings.avatar_start_budget)
+    except BaseException:
+        avatar_task.cancel()
+        raise
+    scheduler.start()
+    startup_memory = max(0, process_memory() - memory_before)
+    ROOM_STARTUP_MEMORY_BYTES.observe(startup_memory)
+    load_reporter.room_started()
+    logger.info("startup room=%s %s", ctx.room.name, timer.summary())
+
+    ingest: IngestServer | None = None
+    if settings.ingest_mode != "off":
+        ingest = IngestServer(ctx.room.name, deliver, settings)
+        try:
+            url = await ingest.start()
+            # Producers on the same host discover the room's endpoint from this attribute.
+            await ctx.room.local_participant.set_attributes({"ingest_url": url})
+        except Exception:
+            logger.exception("failed to start agent ingest for room %s", ctx.room.name)
 
     waiters = [
         getattr(ctx, "wait_for_disconnect", None),
         getattr(ctx.room, "wait_for_disconnect", None),
     ]
-    for waiter in waiters:
-        if callable(waiter):
-            await waiter()
-            return
-    await asyncio.Event().wait()
+    try:
+        for waiter in waiters:
+            if callable(waiter):
+                await waiter()
+                return
+        await asyncio.Event().wait()
+    finally:
+        logger.info(
+            "speech stats room=%s scheduler=%s decoder=%s ingest=%s",
+            ctx.room.name,
+            scheduler.stats,
+            decoder.stats,
+            ingest.stats if ingest is not None else None,
+        )
+        logger.info("memory room=%s %s", ctx.room.name, load_reporter.memory_summary(startup_memory))
+        logger.info("tts clients room=%s clients=%s %s", ctx.room.name, len(tts_clients), tts_clients.stats)
+        if isinstance(speech_tts, HedgedTTS):
+            logger.info("tts hedge stats room=%s %s", ctx.room.name, speech_tts.stats)
+        load_reporter.room_finished()
+        if ingest is not None:
+            await ingest.stop()
+        avatar_task.cancel()
+        streams.close_all()
+        for task in text_stream_tasks:
+            task.cancel()
+        await scheduler.stop()
+        await warmer.stop()
+        await tts_clients.aclose()
 
 
 if __name__ == "__main__":
     settings = get_settings()
     if len(sys.argv) == 1:
         sys.argv.append("start")
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, agent_name=settings.agent_name))
+    if settings.metrics_port:
+        start_metrics_listener(settings.metrics_host, settings.metrics_port)
+    cli.run_app(
+        WorkerOptions(
+            entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            agent_name=settings.agent_name,
+            load_fnc=LoadCalculator(settings),
+            load_threshold=settings.worker_load_threshold,
+            # High-density mode runs rooms as threads of the worker process, sharing one
+            # interpreter, imported modules, the TTS cache and the limiters.
+            job_executor_type=JobExecutorType.THREAD if settings.job_executor == "thread" else JobExecutorType.PROCESS,
+        )
+    )
@@ -0,0 +1,100 @@
+import logging
+import os
+import time
+from contextlib import aclosing
+from typing import AsyncIterator
+
+from livekit import rtc
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess, start_http_server
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+RECEIVE_TO_SAY_SECONDS = Histogram(
+    "agent_receive_to_say_seconds",
+    "Time from receiving speak text to calling say(), including queueing",
+    buckets=LATENCY_BUCKETS,
+)
+SAY_TO_FIRST_FRAME_SECONDS = Histogram(
+    "agent_say_to_first_frame_seconds",
+    "Time from say() to the first audio frame handed to the session",
+    buckets=LATENCY_BUCKETS,
+)
+STARTUP_STAGE_SECONDS = Histogram(
+    "agent_startup_stage_seconds",
+    "Duration of each room startup stage",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+TAVUS_START_SECONDS = Histogram(
+    "agent_tavus_start_seconds",
+    "Time to start the Tavus avatar, including retries",
+    buckets=LATENCY_BUCKETS,
+)
+AUDIO_ONLY_FALLBACKS = Counter(
+    "agent_audio_only_fallbacks_total",
+    "Rooms that started speaking before the avatar was ready",
+)
+SPEAK_SHED = Counter(
+    "agent_speak_shed_total",
+    "Speak messages dropped by rate limiting by scope",
+    ["scope"],
+)
+
+TTS_HEDGE_EVENTS = Counter(
+    "agent_tts_hedge_events_total",
+    "Hedged TTS requests, races won by the first or the hedge request, errors and failovers",
+    ["event"],
+)
+
+TTS_CLIENTS = Counter(
+    "agent_tts_clients_total",
+    "TTS client registry lookups by result: hit, created, evicted or rejected",
+    ["result"],
+)
+
+WORKER_LOAD = Gauge(
+    "agent_worker_load",
+    "Worker load reported to LiveKit and the signals it is built from",
+    ["signal"],
+    multiprocess_mode="max",
+)
+
+ROOM_STARTUP_MEMORY_BYTES = Histogram(
+    "agent_room_startup_memory_bytes",
+    "Growth of process RSS while one room started",
+    buckets=(1 << 20, 4 << 20, 16 << 20, 32 << 20, 64 << 20, 128 << 20, 256 << 20, 512 << 20),
+)
+PROCESS_RSS_BYTES = Gauge(
+    "agent_process_rss_bytes",
+    "Resident memory of job processes",
+    multiprocess_mode="livesum",
+)
+ROOMS_IN_PROCESS = Gauge(
+    "agent_rooms_in_process",
+    "Rooms running in job processes",
+    multiprocess_mode="livesum",
+)
+
+
+async def observe_first_frame(frames: AsyncIterator[rtc.AudioFrame], started: float) -> AsyncIterator[rtc.AudioFrame]:
+    first = True
+    async with aclosing(frames) as stream:
+        async for frame in stream:
+            if first:
+                SAY_TO_FIRST_FRAME_SECONDS.observe(time.perf_counter() - started)
+                first = False
+            yield frame
+
+
+def start_metrics_listener(host: str, port: int) -> None:
+    # The directory was prepared when the agent package was imported (see multiproc.py); job
+    # processes inherit it, so the worker process can serve their samples.
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    start_http_server(port, addr=host, registry=registry)
+    logger.info("agent metrics listening on http://%s:%s/metrics", host, port)
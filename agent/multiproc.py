@@ -0,0 +1,28 @@
+import atexit
+import glob
+import os
+import shutil
+import tempfile
+
+from dotenv import load_dotenv
+
+_OWNER_ENV = "AGENT_METRICS_OWNER"
+
+
+def prepare_multiprocess_metrics() -> None:
+    # prometheus_client picks its value storage when it is imported, so this must run first.
+    load_dotenv()
+    if os.getenv("AGENT_METRICS_PORT", "0") in ("", "0") or os.getenv(_OWNER_ENV):
+        return
+    # Job processes inherit both variables: they skip this setup and write into the worker's directory.
+    os.environ[_OWNER_ENV] = str(os.getpid())
+    directory = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        directory = tempfile.mkdtemp(prefix="agent-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
+        return
+    # Files left by an earlier worker would be added to this one's samples.
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.unlink(path)
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Iterable
+
+from livekit import rtc
+
+from shared.text import split_text
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+async def _produce(frames: AsyncIterator[rtc.AudioFrame], queue: asyncio.Queue, chunk: str) -> None:
+    try:
+        async with aclosing(frames) as stream:
+            async for frame in stream:
+                queue.put_nowait(frame)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("Synthesis failed for chunk: %s", chunk)
+    finally:
+        queue.put_nowait(_DONE)
+
+
+async def split_fragments(fragments: AsyncIterator[str], max_chars: int) -> AsyncIterator[str]:
+    async with aclosing(fragments) as stream:
+        async for fragment in stream:
+            for chunk in split_text(fragment, max_chars):
+                yield chunk
+
+
+async def _iterate(chunks: Iterable[str] | AsyncIterator[str]) -> AsyncIterator[str]:
+    if isinstance(chunks, AsyncIterator):
+        async with aclosing(chunks) as stream:
+            async for chunk in stream:
+                yield chunk
+    else:
+        for chunk in chunks:
+            yield chunk
+
+
+async def pipelined_frames(
+    chunks: Iterable[str] | AsyncIterator[str],
+    synthesize: Callable[[str], AsyncIterator[rtc.AudioFrame]],
+    lookahead: int,
+) -> AsyncIterator[rtc.AudioFrame]:
+    queues: list[asyncio.Queue] = []
+    tasks: list[asyncio.Task[None]] = []
+    playing = 0
+    fed_all = False
+    arrived = asyncio.Event()
+    advanced = asyncio.Event()
+
+    async def feed() -> None:
+        # Chunks may still be arriving (streamed text); start each one's synthesis as soon
+        # as it is within `lookahead` of the chunk that is playing.
+        nonlocal fed_all
+        try:
+            async for chunk in _iterate(chunks):
+                while len(queues) > playing + lookahead:
+                    advanced.clear()
+                    await advanced.wait()
+                queue: asyncio.Queue = asyncio.Queue()
+                queues.append(queue)
+                tasks.append(asyncio.create_task(_produce(synthesize(chunk), queue, chunk)))
+                arrived.set()
+        except Exception:
+            logger.exception("Speech text source failed")
+        finally:
+            fed_all = True
+            arrived.set()
+
+    feeder = asyncio.create_task(feed())
+    try:
+        while True:
+            while playing >= len(queues):
+                if fed_all:
+                    return
+                arrived.clear()
+                await arrived.wait()
+            queue = queues[playing]
+            while (item := await queue.get()) is not _DONE:
+                yield item
+            playing += 1
+            advanced.set()
+    finally:
+        feeder.cancel()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(feeder, *tasks, return_exceptions=True)
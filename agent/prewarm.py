@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Callable
+
+from livekit import rtc
+from livekit.agents import JobProcess
+from livekit.plugins import openai
+from openai import AsyncClient
+
+from .config import Settings, get_settings
+from .tts_cache import get_tts_cache
+
+logger = logging.getLogger(__name__)
+
+
+def build_openai_client(settings: Settings) -> AsyncClient:
+    # TTS clients built on it share one connection pool, which the keep-alive ping keeps open.
+    return AsyncClient(api_key=settings.openai_api_key, max_retries=0)
+
+
+def build_tts(
+    settings: Settings,
+    model: str | None = None,
+    voice: str | None = None,
+    client: AsyncClient | None = None,
+) -> openai.TTS:
+    return openai.TTS(
+        model=model or settings.openai_tts_model,
+        voice=voice or settings.openai_tts_voice,
+        client=client,
+    )
+
+
+def build_fallback_tts(
+    settings: Settings,
+    voice: str | None = None,
+    client: AsyncClient | None = None,
+) -> openai.TTS | None:
+    # A voice picked per message is kept on the fallback; otherwise the configured fallback voice is used.
+    if not settings.tts_fallback_model:
+        return None
+    return openai.TTS(
+        model=settings.tts_fallback_model,
+        voice=voice or settings.tts_fallback_voice or settings.openai_tts_voice,
+        client=client,
+    )
+
+
+class TTSWarmer:
+    def __init__(self, client: AsyncClient | None, model: str, keepalive_interval: float) -> None:
+        # Without a shared client there is no pool to keep warm, and ping() does nothing.
+        self.client = client
+        self.model = model
+        self.keepalive_interval = keepalive_interval
+        self._task: asyncio.Task[None] | None = None
+        self._warmup: asyncio.Task[None] | None = None
+
+    def start_keepalive(self) -> None:
+        if self.keepalive_interval <= 0:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._keepalive())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def ping(self) -> None:
+        # A cheap authenticated GET keeps the provider's pooled HTTPS connection open.
+        if self.client is None:
+            return
+        try:
+            await self.client.models.retrieve(self.model)
+        except Exception as exc:
+            logger.debug("tts keep-alive ping failed: %s", exc)
+
+    async def _keepalive(self) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            await self.ping()
+
+    def warmup(self, synthesize: Callable[[str], AsyncIterator[rtc.AudioFrame]], text: str) -> asyncio.Task[None]:
+        if self._warmup is None:
+            self._warmup = asyncio.create_task(self._run_warmup(synthesize, text))
+        return self._warmup
+
+    async def _run_warmup(self, synthesize: Callable[[str], AsyncIterator[rtc.AudioFrame]], text: str) -> None:
+        if not text:
+            await self.ping()
+            return
+        try:
+            async for _ in synthesize(text):
+                pass
+            logger.info("tts warmup utterance synthesized")
+        except Exception:
+            logger.exception("tts warmup failed")
+
+
+def prewarm(proc: JobProcess) -> None:
+    settings = get_settings()
+    client = build_openai_client(settings)
+    proc.userdata["openai_client"] = client
+    proc.userdata["tts"] = build_tts(settings, client=client)
+    proc.userdata["tts_fallback"] = build_fallback_tts(settings, client=client)
+    proc.userdata["tts_warmer"] = TTSWarmer(client, settings.openai_tts_model, settings.tts_keepalive_interval)
+    get_tts_cache()
+    logger.info("prewarmed tts model=%s voice=%s", settings.openai_tts_model, settings.openai_tts_voice)
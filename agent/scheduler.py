@@ -0,0 +1,135 @@
+import asyncio
+import inspect
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable
+
+from .streaming import TextStream
+
+logger = logging.getLogger(__name__)
+
+
+def _log_interrupt_error(future: "asyncio.Future[Any]") -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Failed to interrupt current speech", exc_info=future.exception())
+
+
+class SpeechPolicy(str, Enum):
+    INTERRUPT = "interrupt"
+    ENQUEUE = "enqueue"
+    COALESCE = "coalesce"
+
+    @classmethod
+    def parse(cls, value: Any, default: "SpeechPolicy") -> "SpeechPolicy":
+        if isinstance(value, str):
+            try:
+                return cls(value.strip().lower())
+            except ValueError:
+                logger.warning("Unknown speech policy %r, using %s", value, default.value)
+        return default
+
+
+@dataclass
+class SpeechRequest:
+    text: str
+    policy: SpeechPolicy
+    received_at: float = field(default_factory=time.time)
+    # Set for streamed speech; `text` then holds only the first fragment.
+    stream: TextStream | None = None
+    # TTS model and voice for this request, already checked against the allow-lists.
+    model: str | None = None
+    voice: str | None = None
+
+
+@dataclass
+class SchedulerStats:
+    accepted: int = 0
+    played: int = 0
+    interrupted: int = 0
+    superseded: int = 0
+    overflow: int = 0
+
+
+class SpeechScheduler:
+    def __init__(
+        self,
+        play: Callable[[SpeechRequest], Awaitable[None]],
+        interrupt: Callable[[], Any],
+        max_queue: int,
+    ) -> None:
+        self.max_queue = max(1, max_queue)
+        self.stats = SchedulerStats()
+        self._play = play
+        self._interrupt = interrupt
+        self._queue: deque[SpeechRequest] = deque()
+        self._wakeup = asyncio.Event()
+        self._playing: SpeechRequest | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def backlog(self) -> int:
+        return len(self._queue)
+
+    @property
+    def busy(self) -> bool:
+        return self._playing is not None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self.stats.superseded += len(self._queue)
+        self._queue.clear()
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def submit(self, request: SpeechRequest) -> bool:
+        if request.policy != SpeechPolicy.ENQUEUE:
+            # Waiting items are superseded before they ever reach TTS.
+            self.stats.superseded += len(self._queue)
+            self._queue.clear()
+        elif len(self._queue) >= self.max_queue:
+            self.stats.overflow += 1
+            logger.warning("Speech queue full (%s), dropping request", self.max_queue)
+            return False
+        self._queue.append(request)
+        self.stats.accepted += 1
+        if request.policy == SpeechPolicy.INTERRUPT and self._playing is not None:
+            self.stats.interrupted += 1
+            self._interrupt_current()
+        self._wakeup.set()
+        return True
+
+    def _interrupt_current(self) -> None:
+        # Called synchronously so it can only ever hit the speech that is playing now.
+        try:
+            result = self._interrupt()
+        except Exception:
+            logger.exception("Failed to interrupt current speech")
+            return
+        if inspect.isawaitable(result):
+            asyncio.ensure_future(result).add_done_callback(_log_interrupt_error)
+
+    async def _run(self) -> None:
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            request = self._queue.popleft()
+            self._playing = request
+            try:
+                await self._play(request)
+                self.stats.played += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to play speech")
+            finally:
+                self._playing = None
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, TypeVar
+
+from livekit.agents.voice.agent_session import AgentSession
+from livekit.plugins import tavus
+
+from .config import Settings, get_settings
+from .metrics import AUDIO_ONLY_FALLBACKS, STARTUP_STAGE_SECONDS, TAVUS_START_SECONDS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TAVUS_RETRY_INITIAL_DELAY = 0.5
+TAVUS_RETRY_MAX_DELAY = 4.0
+
+
+class StageTimer:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: dict[str, tuple[float, float]] = {}
+
+    async def run(self, name: str, awaitable: Awaitable[T]) -> T:
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            end = time.perf_counter()
+            self.stages[name] = (start - self.started, end - self.started)
+            STARTUP_STAGE_SECONDS.labels(name).observe(end - start)
+
+    def summary(self) -> str:
+        ordered = sorted(self.stages.items(), key=lambda item: item[1][0])
+        parts = [f"{name}={start:.3f}-{end:.3f}s" for name, (start, end) in ordered]
+        if ordered:
+            critical = max(ordered, key=lambda item: item[1][1])[0]
+            parts.append(f"critical={critical}")
+        parts.append(f"total={time.perf_counter() - self.started:.3f}s")
+        return " ".join(parts)
+
+
+def build_avatar(settings: Settings) -> tavus.AvatarSession:
+    return tavus.AvatarSession(
+        replica_id=settings.tavus_replica_id,
+        persona_id=settings.tavus_persona_id,
+        api_key=settings.tavus_api_key,
+        avatar_participant_name="Tavus-avatar",
+        avatar_participant_identity="tavus-avatar",
+    )
+
+
+async def _start_tavus_once(
+    avatar_session: tavus.AvatarSession,
+    agent_session: AgentSession,
+    room: Any,
+) -> tavus.AvatarSession:
+    settings = get_settings()
+    await avatar_session.start(
+        agent_session=agent_session,
+        room=room,
+        livekit_url=settings.livekit_url,
+        livekit_api_key=settings.livekit_api_key,
+        livekit_api_secret=settings.livekit_api_secret,
+    )
+    return avatar_session
+
+
+async def start_tavus_with_retry(
+    agent_session: AgentSession,
+    room: Any,
+    deadline: float,
+    avatar_session: tavus.AvatarSession | None = None,
+) -> tavus.AvatarSession:
+    with TAVUS_START_SECONDS.time():
+        return await _start_tavus_with_retry(agent_session, room, deadline, avatar_session)
+
+
+async def _start_tavus_with_retry(
+    agent_session: AgentSession,
+    room: Any,
+    deadline: float,
+    avatar_session: tavus.AvatarSession | None,
+) -> tavus.AvatarSession:
+    # Retries are bounded by a total deadline (time.monotonic()) instead of an attempt count.
+    delay = TAVUS_RETRY_INITIAL_DELAY
+    attempt = 0
+    while True:
+        attempt += 1
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"tavus start exceeded its deadline after {attempt - 1} attempts")
+        avatar = avatar_session or build_avatar(get_settings())
+        avatar_session = None
+        try:
+            session = await asyncio.wait_for(_start_tavus_once(avatar, agent_session, room), timeout=remaining)
+            logger.info("tavus avatar started participant=Tavus-avatar attempt=%s", attempt)
+            return session
+        except Exception:
+            logger.exception("tavus start failed attempt=%s", attempt)
+            remaining = deadline - time.monotonic()
+            if remaining <= delay:
+                raise
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, TAVUS_RETRY_MAX_DELAY)
+
+
+def _log_background_avatar(task: "asyncio.Task[Any]") -> None:
+    if task.cancelled():
+        return
+    if task.exception() is not None:
+        logger.error("tavus avatar failed to start, staying audio-only", exc_info=task.exception())
+    else:
+        logger.info("tavus avatar joined late, audio handed over to the avatar")
+
+
+async def wait_for_avatar(avatar_task: "asyncio.Task[Any]", budget: float) -> bool:
+    if budget <= 0:
+        await avatar_task
+        return True
+    done, _ = await asyncio.wait({avatar_task}, timeout=budget)
+    if done:
+        # Within budget, a failed avatar start still fails the job as before.
+        avatar_task.result()
+        return True
+    AUDIO_ONLY_FALLBACKS.inc()
+    logger.warning("tavus avatar not ready after %.1fs, speaking audio-only", budget)
+    avatar_task.add_done_callback(_log_background_avatar)
+    return False
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+STREAM_IDLE_TIMEOUT = 30.0
+MAX_OPEN_STREAMS = 16
+MAX_FINISHED_IDS = 256
+
+
+class TextStream:
+    def __init__(self, stream_id: int, idle_timeout: float = STREAM_IDLE_TIMEOUT) -> None:
+        self.stream_id = stream_id
+        self.idle_timeout = idle_timeout
+        self.finished = False
+        self._fragments: list[str] = []
+        self._early: dict[int, tuple[str, bool]] = {}
+        self._next_index = 0
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        # Every waiting cursor holds the old event; swapping it wakes all of them at once.
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def push(self, index: int, text: str, end: bool = False) -> None:
+        if self.finished or index < self._next_index:
+            return
+        # Fragments sent as separate packets may arrive out of order; release them in order.
+        self._early[index] = (text, end)
+        while self._next_index in self._early:
+            text, end = self._early.pop(self._next_index)
+            self._next_index += 1
+            if text:
+                self._fragments.append(text)
+            if end:
+                self.finished = True
+                self._early.clear()
+                break
+        self._notify()
+
+    def append(self, text: str) -> None:
+        self.push(self._next_index, text)
+
+    def finish(self) -> None:
+        if not self.finished:
+            self.finished = True
+            self._early.clear()
+            self._notify()
+
+    async def fragments(self) -> AsyncIterator[str]:
+        position = 0
+        while True:
+            while position < len(self._fragments):
+                yield self._fragments[position]
+                position += 1
+            if self.finished:
+                return
+            changed = self._changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=self.idle_timeout)
+            except TimeoutError:
+                logger.warning("Text stream %s idle for %.0fs, closing it", self.stream_id, self.idle_timeout)
+                self.finish()
+
+
+class StreamRegistry:
+    def __init__(self, idle_timeout: float = STREAM_IDLE_TIMEOUT) -> None:
+        self.idle_timeout = idle_timeout
+        self._open: OrderedDict[int, TextStream] = OrderedDict()
+        self._finished: OrderedDict[int, None] = OrderedDict()
+
+    def open(self, stream_id: int) -> tuple[TextStream | None, bool]:
+        # Returns the stream and whether this call created it; fragments of streams that
+        # already ended are ignored.
+        if stream_id in self._finished:
+            return None, False
+        stream = self._open.get(stream_id)
+        if stream is not None:
+            return stream, False
+        while len(self._open) >= MAX_OPEN_STREAMS:
+            _, stale = self._open.popitem(last=False)
+            self._close(stale)
+        stream = self._open[stream_id] = TextStream(stream_id, self.idle_timeout)
+        return stream, True
+
+    def release(self, stream: TextStream) -> None:
+        if stream.finished and self._open.get(stream.stream_id) is stream:
+            del self._open[stream.stream_id]
+            self._close(stream)
+
+    def _close(self, stream: TextStream) -> None:
+        stream.finish()
+        self._finished[stream.stream_id] = None
+        if len(self._finished) > MAX_FINISHED_IDS:
+            self._finished.popitem(last=False)
+
+    def close_all(self) -> None:
+        while self._open:
+            _, stream = self._open.popitem(last=False)
+            self._close(stream)
@@ -0,0 +1,266 @@
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Iterator
+
+from livekit import rtc
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 20
+_HEADER = struct.Struct("<4sBIH")
+_MAGIC = b"LKTC"
+_VERSION = 1
+_SUFFIX = ".pcm"
+# The directory is rescanned after this fraction of the disk budget has been written locally.
+_RESCAN_FRACTION = 32
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def cache_key(model: str, voice: str, text: str) -> str:
+    material = "\0".join((model, voice, normalize_text(text)))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedAudio:
+    pcm: bytes | memoryview
+    sample_rate: int
+    num_channels: int
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.pcm)
+
+    def frames(self, frame_ms: int = FRAME_MS) -> Iterator[rtc.AudioFrame]:
+        samples = max(1, self.sample_rate * frame_ms // 1000)
+        step = samples * self.num_channels * 2
+        for offset in range(0, len(self.pcm), step):
+            chunk = self.pcm[offset : offset + step]
+            yield rtc.AudioFrame(
+                data=chunk,
+                sample_rate=self.sample_rate,
+                num_channels=self.num_channels,
+                samples_per_channel=len(chunk) // (self.num_channels * 2),
+            )
+
+
+class MemoryTier:
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict[str, CachedAudio] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedAudio | None:
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+            return audio
+
+    def put(self, key: str, audio: CachedAudio) -> None:
+        if audio.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+            self._entries[key] = audio
+            self.nbytes += audio.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+
+class DiskTier:
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._rescan_bytes = max(1, max_bytes // _RESCAN_FRACTION)
+        self._written = 0
+        self.nbytes = sum(size for _, _, size in self._scan())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def _scan(self) -> list[tuple[float, str, int]]:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def get(self, key: str) -> CachedAudio | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handle:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+        if len(mapped) < _HEADER.size:
+            mapped.close()
+            return None
+        magic, version, sample_rate, num_channels = _HEADER.unpack_from(mapped)
+        if magic != _MAGIC or version != _VERSION:
+            mapped.close()
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        # The mapping is shared page cache, so every worker on the host reads the same pages.
+        return CachedAudio(
+            pcm=memoryview(mapped)[_HEADER.size :],
+            sample_rate=sample_rate,
+            num_channels=num_channels,
+        )
+
+    def put(self, key: str, audio: CachedAudio) -> None:
+        path = self._path(key)
+        size = _HEADER.size + audio.nbytes
+        try:
+            previous = os.stat(path).st_size
+        except FileNotFoundError:
+            previous = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(_HEADER.pack(_MAGIC, _VERSION, audio.sample_rate, audio.num_channels))
+                handle.write(audio.pcm)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        with self._lock:
+            # An overwrite only changes the total by the size difference.
+            self.nbytes += size - previous
+            self._written += size
+            # Every process on the host writes to the same directory, and this count only sees
+            # local writes. Rescanning regularly keeps the whole directory within the budget.
+            if self.nbytes > self.max_bytes or self._written >= self._rescan_bytes:
+                self._rescan()
+
+    def _rescan(self) -> None:
+        entries = sorted(self._scan())
+        total = sum(size for _, _, size in entries)
+        self._written = 0
+        target = self.max_bytes * 9 // 10 if total > self.max_bytes else total
+        for _, path, size in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.nbytes = total
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+
+
+class TTSCache:
+    def __init__(self, memory: MemoryTier | None, disk: DiskTier | None) -> None:
+        self.memory = memory
+        self.disk = disk
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> CachedAudio | None:
+        if self.memory is not None:
+            audio = self.memory.get(key)
+            if audio is not None:
+                self.stats.memory_hits += 1
+                return audio
+        if self.disk is not None:
+            audio = self.disk.get(key)
+            if audio is not None:
+                self.stats.disk_hits += 1
+                if self.memory is not None:
+                    self.memory.put(key, audio)
+                return audio
+        self.stats.misses += 1
+        return None
+
+    async def put(self, key: str, audio: CachedAudio) -> None:
+        self.stats.stores += 1
+        if self.memory is not None:
+            self.memory.put(key, audio)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.put, key, audio)
+            except Exception:
+                logger.exception("Failed to write TTS cache entry %s", key)
+
+
+@lru_cache(maxsize=1)
+def get_tts_cache() -> TTSCache | None:
+    settings = get_settings()
+    memory = MemoryTier(settings.tts_cache_memory_bytes) if settings.tts_cache_memory_bytes > 0 else None
+    disk = DiskTier(settings.tts_cache_dir, settings.tts_cache_disk_bytes) if settings.tts_cache_dir else None
+    if memory is None and disk is None:
+        return None
+    return TTSCache(memory, disk)
+
+
+async def synthesize_frames(tts: Any, text: str) -> AsyncIterator[rtc.AudioFrame]:
+    async with tts.synthesize(text) as stream:
+        async for event in stream:
+            yield event.frame
+
+
+async def cached_frames(
+    cache: TTSCache,
+    tts: Any,
+    model: str,
+    voice: str,
+    text: str,
+) -> AsyncIterator[rtc.AudioFrame]:
+    key = cache_key(model, voice, text)
+    audio = cache.get(key)
+    if audio is not None:
+        for frame in audio.frames():
+            yield frame
+        return
+
+    chunks: list[bytes] = []
+    sample_rate = num_channels = 0
+    async with tts.synthesize(text) as stream:
+        async for event in stream:
+            frame = event.frame
+            sample_rate, num_channels = frame.sample_rate, frame.num_channels
+            chunks.append(bytes(frame.data))
+            yield frame
+    # Only complete syntheses reach this point; interrupted playback closes the generator early.
+    # A stream may decline caching, e.g. when another model or voice than the key's produced it.
+    if chunks and getattr(stream, "cacheable", True):
+        await cache.put(key, CachedAudio(pcm=b"".join(chunks), sample_rate=sample_rate, num_channels=num_channels))
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable
+
+from livekit import rtc
+
+from .metrics import TTS_CLIENTS
+from .tts_cache import TTSCache, cached_frames, synthesize_frames
+
+logger = logging.getLogger(__name__)
+
+TTSKey = tuple[str, str]
+
+
+@dataclass
+class _Entry:
+    client: Any
+    leases: int = 0
+
+
+@dataclass
+class RegistryStats:
+    hits: int = 0
+    created: int = 0
+    evicted: int = 0
+    rejected: int = 0
+
+
+async def _close_client(client: Any) -> None:
+    close = getattr(client, "aclose", None)
+    if not callable(close):
+        return
+    try:
+        await close()
+    except Exception:
+        logger.warning("Failed to close evicted TTS client", exc_info=True)
+
+
+class TTSClientRegistry:
+    def __init__(
+        self,
+        factory: Callable[[str, str], Any],
+        default_model: str,
+        default_voice: str,
+        default_client: Any,
+        max_clients: int = 8,
+        models: tuple[str, ...] = (),
+        voices: tuple[str, ...] = (),
+    ) -> None:
+        # Empty allow-lists accept any model or voice the provider knows.
+        self.factory = factory
+        self.default = (default_model, default_voice)
+        self.max_clients = max(1, max_clients)
+        self.models = models
+        self.voices = voices
+        self.stats = RegistryStats()
+        self._entries: OrderedDict[TTSKey, _Entry] = OrderedDict()
+        self._default_entry = _Entry(default_client)
+        self._closing: set[asyncio.Task[None]] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries) + 1
+
+    def resolve(self, model: Any = None, voice: Any = None) -> TTSKey:
+        default_model, default_voice = self.default
+        model = model if isinstance(model, str) and model else default_model
+        voice = voice if isinstance(voice, str) and voice else default_voice
+        if self.models and model not in self.models:
+            logger.warning("TTS model %r is not allowed, using %s", model, default_model)
+            self.stats.rejected += 1
+            TTS_CLIENTS.labels("rejected").inc()
+            model = default_model
+        if self.voices and voice not in self.voices:
+            logger.warning("TTS voice %r is not allowed, using %s", voice, default_voice)
+            self.stats.rejected += 1
+            TTS_CLIENTS.labels("rejected").inc()
+            voice = default_voice
+        return model, voice
+
+    def _acquire(self, key: TTSKey) -> _Entry:
+        if key == self.default:
+            entry = self._default_entry
+        else:
+            entry = self._entries.get(key)
+            if entry is None:
+                # Leased before eviction runs, so the new client is never the one closed.
+                entry = self._entries[key] = _Entry(self.factory(*key), leases=1)
+                self.stats.created += 1
+                TTS_CLIENTS.labels("created").inc()
+                self._evict()
+                return entry
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            TTS_CLIENTS.labels("hit").inc()
+        entry.leases += 1
+        return entry
+
+    def _evict(self) -> None:
+        # The default client is never evicted and takes one slot. Clients that are still
+        # synthesizing are skipped; the registry shrinks back once they finish.
+        excess = len(self) - self.max_clients
+        for key in list(self._entries):
+            if excess <= 0:
+                break
+            entry = self._entries[key]
+            if entry.leases:
+                continue
+            del self._entries[key]
+            excess -= 1
+            self.stats.evicted += 1
+            TTS_CLIENTS.labels("evicted").inc()
+            task = asyncio.create_task(_close_client(entry.client))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def frames(
+        self,
+        key: TTSKey,
+        text: str,
+        cache: TTSCache | None = None,
+    ) -> AsyncIterator[rtc.AudioFrame]:
+        entry = self._acquire(key)
+        try:
+            if cache is None:
+                source = synthesize_frames(entry.client, text)
+            else:
+                source = cached_frames(cache, entry.client, key[0], key[1], text)
+            async with aclosing(source) as stream:
+                async for frame in stream:
+                    yield frame
+        finally:
+            entry.leases -= 1
+            if entry.leases == 0 and len(self) > self.max_clients:
+                self._evict()
+
+    async def aclose(self) -> None:
+        # The default client belongs to the worker process and outlives the room.
+        entries, self._entries = list(self._entries.values()), OrderedDict()
+        await asyncio.gather(*(_close_client(entry.client) for entry in entries), *self._closing)
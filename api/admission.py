@@ -0,0 +1,25 @@
+from functools import lru_cache
+
+from shared.ratelimit import RateLimiter
+
+from .config import get_settings
+from .metrics import SPEAK_RATE_LIMITED
+
+
+@lru_cache(maxsize=1)
+def get_speak_limiter() -> RateLimiter:
+    settings = get_settings()
+    return RateLimiter(
+        rate=settings.speak_rate_per_room,
+        burst=settings.speak_burst_per_room,
+        global_rate=settings.speak_rate_global,
+        global_burst=settings.speak_burst_global,
+    )
+
+
+def admit_speak(room_name: str) -> float:
+    # Returns 0 when the request may proceed, otherwise the seconds to wait.
+    retry_after, scope = get_speak_limiter().check(room_name)
+    if scope is not None:
+        SPEAK_RATE_LIMITED.labels(scope).inc()
+    return retry_after
@@ -0,0 +1,161 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from .config import get_settings
+from .metrics import CAPTURE_EVENTS
+
+logger = logging.getLogger(__name__)
+
+_PREFIX = "capture-"
+_SUFFIX = ".jsonl"
+_STOP = object()
+
+
+@dataclass
+class CaptureStats:
+    written: int = 0
+    dropped: int = 0
+    files: int = 0
+
+
+class TrafficCapture:
+    def __init__(
+        self,
+        directory: str,
+        include_text: bool = False,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_files: int = 20,
+        queue_size: int = 10_000,
+    ) -> None:
+        self.directory = directory
+        self.include_text = include_text
+        self.max_bytes = max(1, max_bytes)
+        self.max_files = max_files
+        self.stats = CaptureStats()
+        # Request handlers only enqueue; encoding and file writes happen on the writer thread.
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max(1, queue_size))
+        self._handle: Any = None
+        self._size = 0
+        self._thread = threading.Thread(target=self._run, name="traffic-capture", daemon=True)
+        os.makedirs(directory, exist_ok=True)
+        self._thread.start()
+
+    def record(self, event: str, room: str | None = None, ts: float | None = None, **fields: Any) -> None:
+        entry = {"ts": time.time() if ts is None else ts, "event": event, "room": room, **fields}
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            # A slow disk costs capture fidelity, never request latency.
+            self.stats.dropped += 1
+            CAPTURE_EVENTS.labels("dropped").inc()
+
+    def speak(self, event: str, room: str | None, text: str, ts: float | None = None, **fields: Any) -> None:
+        if self.include_text:
+            fields["text"] = text
+        self.record(event, room, ts, chars=len(text), **fields)
+
+    def close(self) -> None:
+        try:
+            self._queue.put(_STOP, timeout=1.0)
+        except queue.Full:
+            logger.warning("Capture queue still full at shutdown; dropping remaining events")
+            return
+        self._thread.join(timeout=5.0)
+
+    def _run(self) -> None:
+        try:
+            while True:
+                entry = self._queue.get()
+                # Write everything already queued before flushing once.
+                while entry is not _STOP:
+                    self._write(entry)
+                    try:
+                        entry = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if self._handle is not None:
+                    self._handle.flush()
+                if entry is _STOP:
+                    return
+        except Exception:
+            logger.exception("Traffic capture writer failed; capture is disabled")
+        finally:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def _write(self, entry: dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        if self._handle is None or self._size + len(line) > self.max_bytes:
+            self._rotate()
+        self._handle.write(line)
+        self._size += len(line)
+        self.stats.written += 1
+        CAPTURE_EVENTS.labels("written").inc()
+
+    def _rotate(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+        # Each uvicorn worker writes its own files; the pid keeps their names apart.
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        path = os.path.join(self.directory, f"{_PREFIX}{stamp}-{os.getpid()}-{self.stats.files}{_SUFFIX}")
+        self._handle = open(path, "a", encoding="utf-8")
+        self._size = 0
+        self.stats.files += 1
+        self._prune()
+
+    def _prune(self) -> None:
+        if self.max_files <= 0:
+            return
+        files = capture_files(self.directory)
+        for path in files[: max(0, len(files) - self.max_files)]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def capture_files(directory: str) -> list[str]:
+    # Oldest first, across every worker's files.
+    found = []
+    for entry in os.scandir(directory):
+        if not (entry.name.startswith(_PREFIX) and entry.name.endswith(_SUFFIX)):
+            continue
+        try:
+            found.append((entry.stat().st_mtime, entry.path))
+        except FileNotFoundError:
+            # Another worker pruned it first.
+            continue
+    return [path for _, path in sorted(found)]
+
+
+_capture: TrafficCapture | None = None
+
+
+def get_traffic_capture() -> TrafficCapture | None:
+    global _capture
+    settings = get_settings()
+    if not settings.capture_dir:
+        return None
+    if _capture is None:
+        _capture = TrafficCapture(
+            settings.capture_dir,
+            include_text=settings.capture_text,
+            max_bytes=settings.capture_max_bytes,
+            max_files=settings.capture_max_files,
+            queue_size=settings.capture_queue_size,
+        )
+    return _capture
+
+
+def close_traffic_capture() -> None:
+    global _capture
+    capture, _capture = _capture, None
+    if capture is not None:
+        capture.close()
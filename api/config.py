@@ -14,8 +14,37 @@ class Settings:
     tavus_api_key: str | None
     tavus_replica_id: str | None
     tavus_persona_id: str | None
+    warm_pool_size: int
+    warm_pool_max_age: float
+    warm_pool_refill_concurrency: int
+    session_dispatch_mode: str
+    dispatch_max_attempts: int
+    dispatch_retry_base_delay: float
+    dispatch_retry_max_delay: float
+    dispatch_record_ttl: float
+    broadcast_concurrency: int
+    token_ttl: int
+    token_offload_threshold: int
+    token_workers: int
+    stream_flush_chars: int
+    speak_coalesce: bool
+    speak_coalesce_max_pending: int
+    session_ttl: float
+    session_registry_path: str | None
+    session_reject_unknown: bool
+    speak_rate_per_room: float
+    speak_burst_per_room: float
+    speak_rate_global: float
+    speak_burst_global: float
+    capture_dir: str | None
+    capture_text: bool
+    capture_max_bytes: int
+    capture_max_files: int
+    capture_queue_size: int
 
 
+SESSION_DISPATCH_MODES = ("inline", "background")
+
 REQUIRED_ENV_VARS = [
     "LIVEKIT_URL",
     "LIVEKIT_API_KEY",
@@ -31,6 +60,45 @@ def _require_env(name: str) -> str:
     return value
 
 
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError as exc:
+        raise RuntimeError(f"Environment variable {name} must be an integer") from exc
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError as exc:
+        raise RuntimeError(f"Environment variable {name} must be a number") from exc
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if not value:
+        return default
+    value = value.strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off"):
+        return False
+    raise RuntimeError(f"Environment variable {name} must be a boolean")
+
+
+def _env_choice(name: str, default: str, choices: tuple[str, ...]) -> str:
+    value = (os.getenv(name) or default).strip().lower()
+    if value not in choices:
+        raise RuntimeError(f"Environment variable {name} must be one of: {', '.join(choices)}")
+    return value
+
+
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
     load_dotenv()
@@ -42,4 +110,31 @@ def get_settings() -> Settings:
         tavus_api_key=os.getenv("TAVUS_API_KEY"),
         tavus_replica_id=os.getenv("TAVUS_REPLICA_ID"),
         tavus_persona_id=os.getenv("TAVUS_PERSONA_ID"),
+        warm_pool_size=_env_int("WARM_POOL_SIZE", 0),
+        warm_pool_max_age=_env_float("WARM_POOL_MAX_AGE", 300.0),
+        warm_pool_refill_concurrency=_env_int("WARM_POOL_REFILL_CONCURRENCY", 4),
+        session_dispatch_mode=_env_choice("SESSION_DISPATCH_MODE", "inline", SESSION_DISPATCH_MODES),
+        dispatch_max_attempts=_env_int("DISPATCH_MAX_ATTEMPTS", 5),
+        dispatch_retry_base_delay=_env_float("DISPATCH_RETRY_BASE_DELAY", 0.5),
+        dispatch_retry_max_delay=_env_float("DISPATCH_RETRY_MAX_DELAY", 8.0),
+        dispatch_record_ttl=_env_float("DISPATCH_RECORD_TTL", 600.0),
+        broadcast_concurrency=_env_int("BROADCAST_CONCURRENCY", 64),
+        token_ttl=_env_int("LIVEKIT_TOKEN_TTL", 6 * 60 * 60),
+        token_offload_threshold=_env_int("TOKEN_OFFLOAD_THRESHOLD", 256),
+        token_workers=_env_int("TOKEN_WORKERS", 0),
+        stream_flush_chars=_env_int("STREAM_FLUSH_CHARS", 200),
+        speak_coalesce=_env_bool("SPEAK_COALESCE", False),
+        speak_coalesce_max_pending=_env_int("SPEAK_COALESCE_MAX_PENDING", 32),
+        session_ttl=_env_float("SESSION_TTL", 6 * 60 * 60),
+        session_registry_path=os.getenv("SESSION_REGISTRY_PATH") or None,
+        session_reject_unknown=_env_bool("SESSION_REJECT_UNKNOWN", False),
+        speak_rate_per_room=_env_float("SPEAK_RATE_PER_ROOM", 0.0),
+        speak_burst_per_room=_env_float("SPEAK_BURST_PER_ROOM", 5.0),
+        speak_rate_global=_env_float("SPEAK_RATE_GLOBAL", 0.0),
+        speak_burst_global=_env_float("SPEAK_BURST_GLOBAL", 100.0),
+        capture_dir=os.getenv("CAPTURE_DIR") or None,
+        capture_text=_env_bool("CAPTURE_TEXT", False),
+        capture_max_bytes=_env_int("CAPTURE_MAX_BYTES", 64 * 1024 * 1024),
+        capture_max_files=_env_int("CAPTURE_MAX_FILES", 20),
+        capture_queue_size=_env_int("CAPTURE_QUEUE_SIZE", 10_000),
     )
@@ -1,10 +1,11 @@
-import asyncio
 import logging
 from typing import Any, Callable
 
 from livekit import api as livekit_api
 
 from .config import get_settings
+from .livekit_client import get_livekit_client
+from .metrics import DISPATCH_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -28,39 +29,27 @@ def _resolve_method(service: Any) -> Callable[..., Any] | None:
     return None
 
 
-async def _maybe_close(api: Any) -> None:
-    close = getattr(api, "aclose", None)
-    if callable(close):
-        await close()
-        return
-    close = getattr(api, "close", None)
-    if callable(close):
-        result = close()
-        if asyncio.iscoroutine(result):
-            await result
+def _resolve_request_cls() -> Any:
+    request_cls = getattr(livekit_api, "CreateAgentDispatchRequest", None)
+    if request_cls is None:
+        request_cls = getattr(livekit_api, "AgentDispatchRequest", None)
+    return request_cls
+
+
+_REQUEST_CLS = _resolve_request_cls()
 
 
 async def dispatch_agent(room_name: str) -> None:
     settings = get_settings()
-    api = livekit_api.LiveKitAPI(
-        settings.livekit_url,
-        settings.livekit_api_key,
-        settings.livekit_api_secret,
-    )
-    try:
-        service = _resolve_service(api)
-        method = _resolve_method(service)
-        if method is None:
-            raise RuntimeError("LiveKit API client does not expose create_dispatch")
-
-        request_cls = getattr(livekit_api, "CreateAgentDispatchRequest", None)
-        if request_cls is None:
-            request_cls = getattr(livekit_api, "AgentDispatchRequest", None)
-        if request_cls is not None:
-            request = request_cls(room=room_name, agent_name=settings.agent_name)
+    client = get_livekit_client()
+    method = client.resolve("dispatch", lambda api: _resolve_method(_resolve_service(api)))
+    if method is None:
+        raise RuntimeError("LiveKit API client does not expose create_dispatch")
+
+    with DISPATCH_SECONDS.time():
+        if _REQUEST_CLS is not None:
+            request = _REQUEST_CLS(room=room_name, agent_name=settings.agent_name)
             await method(request)
         else:
             await method(room=room_name, agent_name=settings.agent_name)
-        logger.info("Dispatched agent %s into room %s", settings.agent_name, room_name)
-    finally:
-        await _maybe_close(api)
+    logger.info("Dispatched agent %s into room %s", settings.agent_name, room_name)
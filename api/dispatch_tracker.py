@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Awaitable, Callable
+
+from .config import get_settings
+from .dispatch import dispatch_agent
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchState(str, Enum):
+    PENDING = "pending"
+    DISPATCHING = "dispatching"
+    DISPATCHED = "dispatched"
+    FAILED = "failed"
+
+
+TERMINAL_STATES = (DispatchState.DISPATCHED, DispatchState.FAILED)
+
+
+@dataclass
+class DispatchRecord:
+    room_name: str
+    identity: str
+    idempotency_key: str | None = None
+    state: DispatchState = DispatchState.PENDING
+    attempts: int = 0
+    error: str | None = None
+    created_at: float = field(default_factory=time.monotonic)
+    updated_at: float = field(default_factory=time.monotonic)
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def set_state(self, state: DispatchState, error: str | None = None) -> None:
+        self.state = state
+        self.error = error
+        self.updated_at = time.monotonic()
+        if state in TERMINAL_STATES:
+            self.done.set()
+
+
+class DispatchTracker:
+    def __init__(
+        self,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        record_ttl: float,
+        dispatch: Callable[[str], Awaitable[None]] = dispatch_agent,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.record_ttl = record_ttl
+        self._dispatch = dispatch
+        self._records: OrderedDict[str, DispatchRecord] = OrderedDict()
+        self._keys: dict[str, str] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def get(self, room_name: str) -> DispatchRecord | None:
+        return self._records.get(room_name)
+
+    def find(self, idempotency_key: str) -> DispatchRecord | None:
+        room_name = self._keys.get(idempotency_key)
+        return self._records.get(room_name) if room_name is not None else None
+
+    def submit(self, room_name: str, identity: str, idempotency_key: str | None = None) -> DispatchRecord:
+        self._prune()
+        if idempotency_key is not None:
+            existing = self.find(idempotency_key)
+            if existing is not None:
+                if existing.state == DispatchState.FAILED:
+                    self._restart(existing)
+                return existing
+        record = DispatchRecord(room_name=room_name, identity=identity, idempotency_key=idempotency_key)
+        self._store(record)
+        self._restart(record)
+        return record
+
+    def record_dispatched(self, room_name: str, identity: str, idempotency_key: str | None = None) -> DispatchRecord:
+        self._prune()
+        record = DispatchRecord(room_name=room_name, identity=identity, idempotency_key=idempotency_key)
+        record.set_state(DispatchState.DISPATCHED)
+        self._store(record)
+        return record
+
+    async def wait(self, room_name: str, timeout: float) -> DispatchRecord | None:
+        record = self._records.get(room_name)
+        if record is None or timeout <= 0 or record.done.is_set():
+            return record
+        try:
+            await asyncio.wait_for(record.done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return record
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _store(self, record: DispatchRecord) -> None:
+        self._records[record.room_name] = record
+        if record.idempotency_key is not None:
+            self._keys[record.idempotency_key] = record.room_name
+
+    def _restart(self, record: DispatchRecord) -> None:
+        record.attempts = 0
+        record.done.clear()
+        record.set_state(DispatchState.PENDING)
+        task = asyncio.create_task(self._run(record))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.record_ttl
+        for room_name, record in list(self._records.items()):
+            if record.created_at >= cutoff:
+                break
+            if record.state not in TERMINAL_STATES:
+                continue
+            del self._records[room_name]
+            if record.idempotency_key is not None and self._keys.get(record.idempotency_key) == room_name:
+                del self._keys[record.idempotency_key]
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (0.5 + random.random() / 2)
+
+    async def _run(self, record: DispatchRecord) -> None:
+        while True:
+            record.attempts += 1
+            record.set_state(DispatchState.DISPATCHING)
+            try:
+                await self._dispatch(record.room_name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(
+                    "Dispatch to room %s failed attempt=%s: %s",
+                    record.room_name,
+                    record.attempts,
+                    exc,
+                )
+                if record.attempts >= self.max_attempts:
+                    record.set_state(DispatchState.FAILED, error=str(exc) or type(exc).__name__)
+                    logger.error("Giving up dispatch to room %s", record.room_name)
+                    return
+                await asyncio.sleep(self._backoff(record.attempts))
+            else:
+                record.set_state(DispatchState.DISPATCHED)
+                return
+
+
+_tracker: DispatchTracker | None = None
+
+
+def get_dispatch_tracker() -> DispatchTracker:
+    global _tracker
+    if _tracker is None:
+        settings = get_settings()
+        _tracker = DispatchTracker(
+            max_attempts=settings.dispatch_max_attempts,
+            base_delay=settings.dispatch_retry_base_delay,
+            max_delay=settings.dispatch_retry_max_delay,
+            record_ttl=settings.dispatch_record_ttl,
+        )
+    return _tracker
+
+
+async def close_dispatch_tracker() -> None:
+    global _tracker
+    tracker, _tracker = _tracker, None
+    if tracker is not None:
+        await tracker.stop()
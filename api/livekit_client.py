@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from typing import Any, Callable
+
+from livekit import api as livekit_api
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+async def _maybe_close(api: Any) -> None:
+    close = getattr(api, "aclose", None)
+    if callable(close):
+        await close()
+        return
+    close = getattr(api, "close", None)
+    if callable(close):
+        result = close()
+        if asyncio.iscoroutine(result):
+            await result
+
+
+class LiveKitClient:
+    def __init__(self, api: Any) -> None:
+        self.api = api
+        self._resolved: dict[str, Any] = {}
+
+    @classmethod
+    def create(cls) -> "LiveKitClient":
+        settings = get_settings()
+        return cls(
+            livekit_api.LiveKitAPI(
+                settings.livekit_url,
+                settings.livekit_api_key,
+                settings.livekit_api_secret,
+            )
+        )
+
+    def resolve(self, key: str, factory: Callable[[Any], Any]) -> Any:
+        # Service/method lookups are reflective; do them once per client.
+        try:
+            return self._resolved[key]
+        except KeyError:
+            value = factory(self.api)
+            self._resolved[key] = value
+            return value
+
+    async def aclose(self) -> None:
+        self._resolved.clear()
+        await _maybe_close(self.api)
+
+
+_client: LiveKitClient | None = None
+
+
+def get_livekit_client() -> LiveKitClient:
+    global _client
+    if _client is None:
+        _client = LiveKitClient.create()
+        logger.info("Created shared LiveKit API client")
+    return _client
+
+
+async def start_livekit_client() -> LiveKitClient:
+    return get_livekit_client()
+
+
+async def close_livekit_client() -> None:
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+        logger.info("Closed shared LiveKit API client")
@@ -0,0 +1,45 @@
+import logging
+import uuid
+from typing import Any, Callable
+
+from livekit import api as livekit_api
+
+from .livekit_client import get_livekit_client
+
+logger = logging.getLogger(__name__)
+
+
+def _resolve_service(api: Any) -> Any:
+    for name in ("room", "room_service", "rooms"):
+        service = getattr(api, name, None)
+        if service is not None:
+            return service
+    return api
+
+
+def _resolve_method(service: Any) -> Callable[..., Any] | None:
+    for name in ("delete_room", "remove_room"):
+        method = getattr(service, name, None)
+        if callable(method):
+            return method
+    return None
+
+
+_REQUEST_CLS = getattr(livekit_api, "DeleteRoomRequest", None)
+
+
+def new_room_name() -> str:
+    return f"room-{uuid.uuid4().hex[:10]}"
+
+
+async def delete_room(room_name: str) -> None:
+    client = get_livekit_client()
+    method = client.resolve("delete_room", lambda api: _resolve_method(_resolve_service(api)))
+    if method is None:
+        raise RuntimeError("LiveKit API client does not expose delete_room")
+
+    if _REQUEST_CLS is not None:
+        await method(_REQUEST_CLS(room=room_name))
+    else:
+        await method(room=room_name)
+    logger.info("Deleted room %s", room_name)
@@ -1,10 +1,16 @@
 import asyncio
+import itertools
 import logging
-from typing import Any, Callable
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
 
 from livekit import api as livekit_api
 
-from .config import get_settings
+from shared.protocol import encode_speak, new_message_id
+
+from .livekit_client import get_livekit_client
+from .metrics import SEND_DATA_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -32,45 +38,106 @@ def _data_kind() -> Any:
     return getattr(kind, "RELIABLE", None) or getattr(kind, "Reliable", None) or kind
 
 
-async def _maybe_close(api: Any) -> None:
-    close = getattr(api, "aclose", None)
-    if callable(close):
-        await close()
-        return
-    close = getattr(api, "close", None)
-    if callable(close):
-        result = close()
-        if asyncio.iscoroutine(result):
-            await result
-
-
-async def send_text_to_room(room_name: str, text: str) -> None:
-    settings = get_settings()
-    api = livekit_api.LiveKitAPI(
-        settings.livekit_url,
-        settings.livekit_api_key,
-        settings.livekit_api_secret,
-    )
-    try:
-        service = _resolve_service(api)
-        method = _resolve_method(service)
-        if method is None:
-            raise RuntimeError("LiveKit API client does not expose send_data")
-
-        request_cls = getattr(livekit_api, "SendDataRequest", None)
-        kind = _data_kind()
-        data = text.encode("utf-8")
-        if request_cls is not None:
-            if kind is None:
-                request = request_cls(room=room_name, data=data, topic="tts")
-            else:
-                request = request_cls(room=room_name, data=data, topic="tts", kind=kind)
-            await method(request)
+_REQUEST_CLS = getattr(livekit_api, "SendDataRequest", None)
+_DATA_KIND = _data_kind()
+_SEQUENCE = itertools.count(1)
+
+
+async def _send_packet(method: Callable[..., Any], room_name: str, data: bytes) -> None:
+    if _REQUEST_CLS is not None:
+        if _DATA_KIND is None:
+            request = _REQUEST_CLS(room=room_name, data=data, topic="tts")
         else:
-            kwargs = {"room": room_name, "data": data, "topic": "tts"}
-            if kind is not None:
-                kwargs["kind"] = kind
-            await method(**kwargs)
-        logger.info("Sent data packet to room %s", room_name)
-    finally:
-        await _maybe_close(api)
+            request = _REQUEST_CLS(room=room_name, data=data, topic="tts", kind=_DATA_KIND)
+        await method(request)
+    else:
+        kwargs = {"room": room_name, "data": data, "topic": "tts"}
+        if _DATA_KIND is not None:
+            kwargs["kind"] = _DATA_KIND
+        await method(**kwargs)
+
+
+def _send_data_method() -> Callable[..., Any]:
+    client = get_livekit_client()
+    method = client.resolve("send_data", lambda api: _resolve_method(_resolve_service(api)))
+    if method is None:
+        raise RuntimeError("LiveKit API client does not expose send_data")
+    return method
+
+
+async def send_text_to_room(
+    room_name: str,
+    text: str,
+    policy: str | None = None,
+    options: dict[str, Any] | None = None,
+) -> None:
+    method = _send_data_method()
+    packets = encode_speak(text, seq=next(_SEQUENCE), policy=policy, options=options)
+    with SEND_DATA_SECONDS.time():
+        # Chunks of one message go out in order over the same reliable channel.
+        for packet in packets:
+            await _send_packet(method, room_name, packet)
+    logger.info("Sent data packet to room %s chunks=%s", room_name, len(packets))
+
+
+class SpeakStream:
+    def __init__(self, room_name: str, policy: str | None = None, options: dict[str, Any] | None = None) -> None:
+        self.room_name = room_name
+        self.policy = policy
+        self.options = options
+        self.fragments = 0
+        self.closed = False
+        self._message_id = new_message_id()
+        self._method = _send_data_method()
+
+    async def send(self, text: str, end: bool = False) -> None:
+        if self.closed:
+            raise RuntimeError("speak stream is closed")
+        # Every fragment is its own message; the agent orders them by fragment index.
+        # Options ride on every fragment because the agent opens the stream on whichever arrives first.
+        packets = encode_speak(
+            text,
+            seq=self.fragments,
+            policy=self.policy,
+            options=self.options,
+            message_id=self._message_id,
+            stream=True,
+            end=end,
+        )
+        self.fragments += 1
+        self.closed = end
+        with SEND_DATA_SECONDS.time():
+            for packet in packets:
+                await _send_packet(self._method, self.room_name, packet)
+
+    async def close(self, text: str = "") -> None:
+        if not self.closed:
+            await self.send(text, end=True)
+            logger.info("Closed speak stream to room %s fragments=%s", self.room_name, self.fragments)
+
+
+@dataclass
+class SendResult:
+    room_name: str
+    error: Exception | None
+    elapsed: float
+
+
+async def send_text_to_rooms(
+    messages: Iterable[tuple[str, str]],
+    concurrency: int,
+    options: dict[str, Any] | None = None,
+) -> list[SendResult]:
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def send_one(room_name: str, text: str) -> SendResult:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await send_text_to_room(room_name, text, options=options)
+            except Exception as exc:
+                logger.warning("Failed to send data packet to room %s: %s", room_name, exc)
+                return SendResult(room_name=room_name, error=exc, elapsed=time.perf_counter() - started)
+            return SendResult(room_name=room_name, error=None, elapsed=time.perf_counter() - started)
+
+    return list(await asyncio.gather(*(send_one(room_name, text) for room_name, text in messages)))
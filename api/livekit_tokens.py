@@ -1,32 +1,128 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import multiprocessing
+import os
+import time
 import uuid
-
-from livekit import api
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
 from .config import get_settings
 
+DEFAULT_GRANTS = {
+    "roomJoin": True,
+    "canPublish": True,
+    "canSubscribe": True,
+    "canPublishData": True,
+}
+
+
+def _b64(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _json(value: object) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+_HEADER = _b64(_json({"alg": "HS256", "typ": "JWT"}).encode("ascii"))
+
+
+def new_identity() -> str:
+    return f"user-{uuid.uuid4().hex[:12]}"
+
+
+class TokenMinter:
+    def __init__(self, api_key: str, api_secret: str, ttl: int) -> None:
+        self.api_key = api_key
+        self.ttl = ttl
+        # The HMAC key schedule is computed once; each token signs a copy.
+        self._mac = hmac.new(api_secret.encode("utf-8"), digestmod=hashlib.sha256)
+        self._iss = _json(api_key)
+        self._grants = _json(DEFAULT_GRANTS)[1:-1]
+
+    def mint(self, room_name: str, identity: str | None = None, now: int | None = None) -> str:
+        issued = int(time.time()) if now is None else now
+        payload = (
+            f'{{"sub":{_json(identity or new_identity())},"iss":{self._iss},'
+            f'"nbf":{issued},"exp":{issued + self.ttl},'
+            f'"video":{{"room":{_json(room_name)},{self._grants}}}}}'
+        )
+        signing_input = _HEADER + b"." + _b64(payload.encode("utf-8"))
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return (signing_input + b"." + _b64(mac.digest())).decode("ascii")
+
+    def mint_many(self, pairs: list[tuple[str, str]]) -> list[str]:
+        now = int(time.time())
+        return [self.mint(room_name, identity, now) for room_name, identity in pairs]
+
+
+@lru_cache(maxsize=1)
+def get_token_minter() -> TokenMinter:
+    settings = get_settings()
+    return TokenMinter(settings.livekit_api_key, settings.livekit_api_secret, settings.token_ttl)
+
 
 def mint_room_token(room_name: str, identity: str | None = None) -> str:
+    return get_token_minter().mint(room_name, identity)
+
+
+@lru_cache(maxsize=4)
+def _worker_minter(api_key: str, api_secret: str, ttl: int) -> TokenMinter:
+    return TokenMinter(api_key, api_secret, ttl)
+
+
+def _mint_chunk(api_key: str, api_secret: str, ttl: int, pairs: list[tuple[str, str]]) -> list[str]:
+    return _worker_minter(api_key, api_secret, ttl).mint_many(pairs)
+
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def _worker_count() -> int:
+    return get_settings().token_workers or os.cpu_count() or 1
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=_worker_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+async def mint_tokens(pairs: list[tuple[str, str]]) -> list[str]:
     settings = get_settings()
-    user_identity = identity or f"user-{uuid.uuid4().hex[:12]}"
-    token = api.AccessToken(settings.livekit_api_key, settings.livekit_api_secret)
-    if hasattr(token, "with_identity"):
-        token.with_identity(user_identity)
-    else:
-        try:
-            token.identity = user_identity
-        except Exception:
-            pass
-
-    video_grants = api.VideoGrants(
-        room_join=True,
-        room=room_name,
-        can_publish=True,
-        can_subscribe=True,
-        can_publish_data=True,
+    if len(pairs) < settings.token_offload_threshold:
+        return get_token_minter().mint_many(pairs)
+
+    executor = _get_executor()
+    chunk_size = max(settings.token_offload_threshold // 2, -(-len(pairs) // _worker_count()))
+    loop = asyncio.get_running_loop()
+    chunks = await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                executor,
+                _mint_chunk,
+                settings.livekit_api_key,
+                settings.livekit_api_secret,
+                settings.token_ttl,
+                pairs[start : start + chunk_size],
+            )
+            for start in range(0, len(pairs), chunk_size)
+        )
     )
-    if hasattr(token, "with_grants"):
-        token.with_grants(video_grants)
-    elif hasattr(token, "add_grant"):
-        token.add_grant(video_grants)
+    return [token for chunk in chunks for token in chunk]
+
 
-    return token.to_jwt()
+def close_token_executor() -> None:
+    global _executor
+    executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -1,21 +1,76 @@
+import codecs
+import hashlib
 import logging
+import math
 import os
-import uuid
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from starlette.requests import ClientDisconnect
 
+from shared.text import SentenceBuffer
+
+from .admission import admit_speak
+from .capture import close_traffic_capture, get_traffic_capture
 from .config import get_settings
 from .dispatch import dispatch_agent
-from .livekit_send import send_text_to_room
-from .livekit_tokens import mint_room_token
-from .models import ConfigResponse, HealthResponse, SessionResponse, SpeakRequest, SpeakResponse
+from .dispatch_tracker import close_dispatch_tracker, get_dispatch_tracker
+from .livekit_client import close_livekit_client, start_livekit_client
+from .livekit_rooms import new_room_name
+from .livekit_send import SpeakStream, send_text_to_room, send_text_to_rooms
+from .livekit_tokens import close_token_executor, mint_room_token, mint_tokens, new_identity
+from .metrics import SESSION_SECONDS, SPEAK_SECONDS, render_metrics
+from .models import (
+    BroadcastRoomResult,
+    BroadcastSpeakRequest,
+    BroadcastSpeakResponse,
+    CoalescerStatsResponse,
+    ConfigResponse,
+    HealthResponse,
+    MintedToken,
+    PoolStatsResponse,
+    SessionInfo,
+    SessionListResponse,
+    SessionResponse,
+    SessionStatusResponse,
+    SpeakRequest,
+    SpeakResponse,
+    SpeechPolicy,
+    StreamSpeakResponse,
+    TokenBatchRequest,
+    TokenBatchResponse,
+    tts_options,
+)
+from .room_pool import close_room_pool, get_room_pool, start_room_pool
+from .session_registry import SessionRecord, close_session_registry, get_session_registry
+from .speak_coalescer import CoalescerFull, close_speak_coalescer, get_speak_coalescer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("api")
 
 settings = get_settings()
 
-app = FastAPI(title="LiveKit + Tavus Prototype API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await start_livekit_client()
+    await start_room_pool()
+    try:
+        yield
+    finally:
+        await close_room_pool()
+        await close_speak_coalescer()
+        await close_dispatch_tracker()
+        await close_livekit_client()
+        close_token_executor()
+        close_session_registry()
+        close_traffic_capture()
+
+
+app = FastAPI(title="LiveKit + Tavus Prototype API", lifespan=lifespan)
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -36,26 +91,386 @@ async def config() -> ConfigResponse:
     )
 
 
-@app.post("/session", response_model=SessionResponse)
-async def create_session() -> SessionResponse:
-    room_name = f"room-{uuid.uuid4().hex[:10]}"
-    identity = f"user-{uuid.uuid4().hex[:12]}"
+@app.get("/metrics")
+async def metrics() -> Response:
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
+
+@app.post("/session", response_model=SessionResponse)
+async def create_session(
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+) -> SessionResponse:
+    arrived_at = time.time()
+    response: SessionResponse | None = None
+    repeat = False
     try:
-        await dispatch_agent(room_name)
-    except Exception as exc:
-        logger.exception("Failed to dispatch agent")
-        raise HTTPException(status_code=500, detail="Failed to dispatch agent") from exc
+        with SESSION_SECONDS.time():
+            response, repeat = await _create_session(idempotency_key)
+        return response
+    finally:
+        capture = get_traffic_capture()
+        if capture is not None:
+            # Failed creations are recorded without a room. Keys are stored hashed so a replay
+            # can send its repeats with matching keys.
+            fields: dict[str, Any] = {"ok": response is not None}
+            if idempotency_key:
+                fields["key"] = hashlib.sha256(idempotency_key.encode("utf-8")).hexdigest()[:16]
+            if repeat:
+                fields["repeat"] = True
+            capture.record("session", response.roomName if response is not None else None, ts=arrived_at, **fields)
+
+
+async def _create_session(idempotency_key: str | None) -> tuple[SessionResponse, bool]:
+    # Returns the session and whether it repeats an earlier request with the same idempotency key.
+    tracker = get_dispatch_tracker()
+    background = settings.session_dispatch_mode == "background"
+
+    existing = tracker.find(idempotency_key) if background and idempotency_key else None
+    if existing is not None:
+        record = tracker.submit(existing.room_name, existing.identity, idempotency_key)
+        await get_session_registry().register(record.room_name, record.identity)
+        token = mint_room_token(record.room_name, identity=record.identity)
+        response = SessionResponse(
+            roomName=record.room_name,
+            livekitUrl=settings.livekit_url,
+            token=token,
+            dispatchState=record.state.value,
+        )
+        return response, True
+
+    identity = new_identity()
+    key = idempotency_key if background else None
 
+    pool = get_room_pool()
+    room_name = pool.acquire() if pool is not None else None
+    if room_name is not None:
+        state = tracker.record_dispatched(room_name, identity, key).state
+    elif background:
+        room_name = new_room_name()
+        state = tracker.submit(room_name, identity, key).state
+    else:
+        room_name = new_room_name()
+        try:
+            await dispatch_agent(room_name)
+        except Exception as exc:
+            logger.exception("Failed to dispatch agent")
+            raise HTTPException(status_code=500, detail="Failed to dispatch agent") from exc
+        state = tracker.record_dispatched(room_name, identity).state
+
+    await get_session_registry().register(room_name, identity)
     token = mint_room_token(room_name, identity=identity)
-    return SessionResponse(roomName=room_name, livekitUrl=settings.livekit_url, token=token)
+    response = SessionResponse(
+        roomName=room_name,
+        livekitUrl=settings.livekit_url,
+        token=token,
+        dispatchState=state.value,
+    )
+    return response, False
+
+
+def _session_info(record: SessionRecord) -> SessionInfo:
+    return SessionInfo(
+        roomName=record.room_name,
+        identity=record.identity,
+        createdAt=record.created_at,
+        expiresAt=record.expires_at,
+        speakCount=record.speak_count,
+        lastSpeakAt=record.last_speak_at,
+    )
+
+
+async def _check_session(room_name: str) -> None:
+    # Unknown or expired rooms are rejected before any LiveKit round trip. The lookup also
+    # caches sessions created by other workers, so record_speak() can count them.
+    if await get_session_registry().get(room_name) is None and settings.session_reject_unknown:
+        raise HTTPException(status_code=404, detail="Unknown session")
+
+
+def _admit(room_name: str) -> None:
+    retry_after = admit_speak(room_name)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many speak requests",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+@app.get("/sessions", response_model=SessionListResponse)
+async def list_sessions(limit: int = Query(default=100, ge=1, le=1000)) -> SessionListResponse:
+    records = await get_session_registry().active(limit)
+    return SessionListResponse(count=len(records), sessions=[_session_info(record) for record in records])
+
+
+@app.get("/sessions/{room_name}", response_model=SessionInfo)
+async def get_session(room_name: str) -> SessionInfo:
+    record = await get_session_registry().get(room_name)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    return _session_info(record)
+
+
+@app.get("/sessions/{room_name}/status", response_model=SessionStatusResponse)
+async def session_status(
+    room_name: str,
+    wait: float = Query(default=0.0, ge=0.0, le=30.0),
+) -> SessionStatusResponse:
+    record = await get_dispatch_tracker().wait(room_name, wait)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    return SessionStatusResponse(
+        roomName=record.room_name,
+        state=record.state.value,
+        attempts=record.attempts,
+        error=record.error,
+    )
+
+
+@app.get("/pool", response_model=PoolStatsResponse)
+async def pool_stats() -> PoolStatsResponse:
+    pool = get_room_pool()
+    if pool is None:
+        return PoolStatsResponse(
+            enabled=False,
+            targetSize=0,
+            size=0,
+            pending=0,
+            hits=0,
+            misses=0,
+            dispatched=0,
+            evicted=0,
+            failures=0,
+        )
+    return PoolStatsResponse(
+        enabled=True,
+        targetSize=pool.target_size,
+        size=pool.size,
+        pending=pool.pending,
+        hits=pool.stats.hits,
+        misses=pool.stats.misses,
+        dispatched=pool.stats.dispatched,
+        evicted=pool.stats.evicted,
+        failures=pool.stats.failures,
+    )
 
 
 @app.post("/rooms/{room_name}/speak", response_model=SpeakResponse)
 async def speak(room_name: str, request: SpeakRequest) -> SpeakResponse:
+    capture = get_traffic_capture()
+    if capture is not None:
+        # Captured on arrival, so replays offer the same load even when it was rejected.
+        capture.speak("speak", room_name, request.text, policy=request.policy, **(request.tts_options() or {}))
+    await _check_session(room_name)
+    _admit(room_name)
+    coalescer = get_speak_coalescer()
+    with SPEAK_SECONDS.time():
+        try:
+            if coalescer is not None:
+                status = await coalescer.submit(room_name, request.text, request.policy, request.tts_options())
+            else:
+                await send_text_to_room(room_name, request.text, request.policy, request.tts_options())
+                status = "sent"
+        except CoalescerFull as exc:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many queued speak requests for this room",
+                headers={"Retry-After": "1"},
+            ) from exc
+        except Exception as exc:
+            logger.exception("Failed to send speak text")
+            raise HTTPException(status_code=500, detail="Failed to send speak text") from exc
+    # Like broadcast, only speaks that reached the room count; superseded ones never did.
+    if status == "sent":
+        get_session_registry().record_speak(room_name)
+    return SpeakResponse(ok=True, status=status)
+
+
+@app.get("/speak/coalescer", response_model=CoalescerStatsResponse)
+async def coalescer_stats() -> CoalescerStatsResponse:
+    coalescer = get_speak_coalescer()
+    if coalescer is None:
+        return CoalescerStatsResponse(
+            enabled=False,
+            activeRooms=0,
+            pending=0,
+            requests=0,
+            sent=0,
+            superseded=0,
+            failed=0,
+            rejected=0,
+        )
+    return CoalescerStatsResponse(
+        enabled=True,
+        activeRooms=coalescer.active_rooms,
+        pending=coalescer.pending,
+        requests=coalescer.stats.requests,
+        sent=coalescer.stats.sent,
+        superseded=coalescer.stats.superseded,
+        failed=coalescer.stats.failed,
+        rejected=coalescer.stats.rejected,
+    )
+
+
+@app.post("/rooms/{room_name}/speak/stream", response_model=StreamSpeakResponse)
+async def speak_stream(
+    room_name: str,
+    request: Request,
+    policy: SpeechPolicy | None = Query(default=None),
+    model: str | None = Query(default=None, min_length=1, max_length=64),
+    voice: str | None = Query(default=None, min_length=1, max_length=64),
+) -> StreamSpeakResponse:
+    # The body is read as it arrives (chunked transfer) and forwarded sentence by
+    # sentence, so the agent starts speaking while the producer is still generating.
+    arrived_at = time.time()
+    started = time.perf_counter()
+    capture = get_traffic_capture()
+    received: list[str] | None = [] if capture is not None and capture.include_text else None
+    received_chars = 0
+    stream: SpeakStream | None = None
+    ok = False
+    try:
+        await _check_session(room_name)
+        _admit(room_name)
+        first_fragment_at: float | None = None
+        chars = 0
+        try:
+            stream = SpeakStream(room_name, policy, tts_options(model, voice))
+        except Exception as exc:
+            logger.exception("Failed to open speak stream")
+            raise HTTPException(status_code=500, detail="Failed to send speak text") from exc
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        sentences = SentenceBuffer(settings.stream_flush_chars)
+        try:
+            async for body in request.stream():
+                text = decoder.decode(body)
+                received_chars += len(text)
+                if received is not None:
+                    received.append(text)
+                for sentence in sentences.push(text):
+                    await stream.send(sentence)
+                    chars += len(sentence)
+                    if first_fragment_at is None:
+                        first_fragment_at = time.perf_counter()
+            text = decoder.decode(b"", final=True)
+            received_chars += len(text)
+            if received is not None:
+                received.append(text)
+            tail = sentences.push(text)
+            tail.append(sentences.flush())
+            for sentence in tail[:-1]:
+                await stream.send(sentence)
+            chars += sum(len(sentence) for sentence in tail)
+            await stream.close(tail[-1])
+        except ClientDisconnect:
+            logger.info("Speak stream client disconnected room=%s", room_name)
+            await _close_stream(stream)
+            raise
+        except Exception as exc:
+            logger.exception("Failed to send speak text")
+            await _close_stream(stream)
+            raise HTTPException(status_code=500, detail="Failed to send speak text") from exc
+        get_session_registry().record_speak(room_name)
+        if first_fragment_at is None and chars:
+            first_fragment_at = time.perf_counter()
+        ok = True
+        return StreamSpeakResponse(
+            ok=True,
+            fragments=stream.fragments,
+            chars=chars,
+            firstFragmentMs=None if first_fragment_at is None else round((first_fragment_at - started) * 1000, 3),
+            elapsedMs=round((time.perf_counter() - started) * 1000, 3),
+        )
+    finally:
+        if capture is not None:
+            # The length is only known once the body ends, so the event is written then, with
+            # its arrival time. Rejected and failed streams are recorded too.
+            fields = {
+                "chars": received_chars,
+                "policy": policy,
+                "fragments": stream.fragments if stream is not None else 0,
+                "duration": round(time.perf_counter() - started, 3),
+                "ok": ok,
+                **(tts_options(model, voice) or {}),
+            }
+            if received is not None:
+                fields["text"] = "".join(received)
+            capture.record("speak_stream", room_name, ts=arrived_at, **fields)
+
+
+async def _close_stream(stream: SpeakStream) -> None:
+    # The agent stops waiting for more text as soon as the end fragment arrives.
     try:
-        await send_text_to_room(room_name, request.text)
-    except Exception as exc:
-        logger.exception("Failed to send speak text")
-        raise HTTPException(status_code=500, detail="Failed to send speak text") from exc
-    return SpeakResponse(ok=True)
+        await stream.close()
+    except Exception:
+        logger.warning("Failed to close speak stream to room %s", stream.room_name)
+
+
+@app.post("/rooms/speak", response_model=BroadcastSpeakResponse)
+async def broadcast_speak(request: BroadcastSpeakRequest) -> BroadcastSpeakResponse:
+    started = time.perf_counter()
+    registry = get_session_registry()
+    pairs = request.pairs()
+    capture = get_traffic_capture()
+    if capture is not None:
+        fields = {"rooms": [room_name for room_name, _ in pairs], "chars": [len(text) for _, text in pairs]}
+        if capture.include_text:
+            fields["texts"] = [text for _, text in pairs]
+        capture.record("broadcast", **fields)
+    unknown: set[str] = set()
+    if settings.session_reject_unknown:
+        rooms = {room_name for room_name, _ in pairs}
+        unknown = {room_name for room_name in rooms if await registry.get(room_name) is None}
+    # Admission is decided per message: a room named twice may have one message admitted and
+    # the other rate limited. Every message in a broadcast counts against its room's and the
+    # global rate limit.
+    outcomes: dict[int, BroadcastRoomResult] = {}
+    admitted: list[int] = []
+    for index, (room_name, _) in enumerate(pairs):
+        if room_name in unknown:
+            error = "UnknownSession"
+        elif admit_speak(room_name) > 0:
+            error = "RateLimited"
+        else:
+            admitted.append(index)
+            continue
+        outcomes[index] = BroadcastRoomResult(room=room_name, ok=False, elapsedMs=0.0, error=error)
+    messages = [pairs[index] for index in admitted]
+    results = await send_text_to_rooms(messages, settings.broadcast_concurrency, request.tts_options())
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for index, result in zip(admitted, results):
+        if result.error is None:
+            registry.record_speak(result.room_name)
+        outcomes[index] = BroadcastRoomResult(
+            room=result.room_name,
+            ok=result.error is None,
+            elapsedMs=round(result.elapsed * 1000, 3),
+            error=None if result.error is None else type(result.error).__name__,
+        )
+    # Results follow the order of the request.
+    room_results = [outcomes[index] for index in range(len(pairs))]
+    failed = sum(1 for result in room_results if not result.ok)
+    return BroadcastSpeakResponse(
+        ok=failed == 0,
+        sent=len(room_results) - failed,
+        failed=failed,
+        elapsedMs=round(elapsed_ms, 3),
+        results=room_results,
+    )
+
+
+@app.post("/tokens", response_model=TokenBatchResponse)
+async def mint_token_batch(request: TokenBatchRequest) -> TokenBatchResponse:
+    started = time.perf_counter()
+    pairs = [(request.room, identity) for identity in request.identities]
+    pairs.extend((request.room, new_identity()) for _ in range(request.count))
+    pairs.extend((room_name, new_identity()) for room_name in request.rooms)
+    tokens = await mint_tokens(pairs)
+    return TokenBatchResponse(
+        livekitUrl=settings.livekit_url,
+        elapsedMs=round((time.perf_counter() - started) * 1000, 3),
+        tokens=[
+            MintedToken(roomName=room_name, identity=identity, token=token)
+            for (room_name, identity), token in zip(pairs, tokens)
+        ],
+    )
@@ -0,0 +1,67 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+SESSION_SECONDS = Histogram(
+    "api_session_seconds",
+    "Time to handle POST /session",
+    buckets=LATENCY_BUCKETS,
+)
+SPEAK_SECONDS = Histogram(
+    "api_speak_seconds",
+    "Time to handle POST /rooms/{room_name}/speak",
+    buckets=LATENCY_BUCKETS,
+)
+SEND_DATA_SECONDS = Histogram(
+    "api_send_data_seconds",
+    "Time to send one data packet through the LiveKit room service",
+    buckets=LATENCY_BUCKETS,
+)
+DISPATCH_SECONDS = Histogram(
+    "api_dispatch_seconds",
+    "Time to create one agent dispatch",
+    buckets=LATENCY_BUCKETS,
+)
+WARM_POOL_REQUESTS = Counter(
+    "api_warm_pool_requests_total",
+    "Warm room pool lookups by result",
+    ["result"],
+)
+
+SPEAK_COALESCER_REQUESTS = Counter(
+    "api_speak_coalescer_requests_total",
+    "Speak requests handled by the per-room coalescer by result",
+    ["result"],
+)
+
+SPEAK_RATE_LIMITED = Counter(
+    "api_speak_rate_limited_total",
+    "Speak requests rejected by rate limiting by scope",
+    ["scope"],
+)
+
+CAPTURE_EVENTS = Counter(
+    "api_capture_events_total",
+    "Traffic capture events by result",
+    ["result"],
+)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    # With several uvicorn workers, PROMETHEUS_MULTIPROC_DIR aggregates all of them.
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
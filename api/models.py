@@ -1,4 +1,10 @@
-from pydantic import BaseModel, Field
+from typing import Literal
+
+from pydantic import BaseModel, Field, model_validator
+
+MAX_SPEAK_TEXT_LENGTH = 5000
+
+SpeechPolicy = Literal["interrupt", "enqueue", "coalesce"]
 
 
 class HealthResponse(BaseModel):
@@ -19,11 +25,149 @@ class SessionResponse(BaseModel):
     roomName: str
     livekitUrl: str
     token: str
+    dispatchState: str = "dispatched"
+
+
+class SessionStatusResponse(BaseModel):
+    roomName: str
+    state: str
+    attempts: int
+    error: str | None = None
+
+
+class SessionInfo(BaseModel):
+    roomName: str
+    identity: str
+    createdAt: float
+    expiresAt: float
+    speakCount: int
+    lastSpeakAt: float | None = None
+
+
+class SessionListResponse(BaseModel):
+    count: int
+    sessions: list[SessionInfo]
+
 
+def tts_options(model: str | None, voice: str | None) -> dict[str, str] | None:
+    options = {key: value for key, value in (("model", model), ("voice", voice)) if value}
+    return options or None
 
-class SpeakRequest(BaseModel):
-    text: str = Field(..., min_length=1, max_length=500)
+
+class TTSSelection(BaseModel):
+    # Optional per-message TTS model and voice; the agent falls back to its defaults.
+    model: str | None = Field(default=None, min_length=1, max_length=64)
+    voice: str | None = Field(default=None, min_length=1, max_length=64)
+
+    def tts_options(self) -> dict[str, str] | None:
+        return tts_options(self.model, self.voice)
+
+
+class SpeakRequest(TTSSelection):
+    text: str = Field(..., min_length=1, max_length=MAX_SPEAK_TEXT_LENGTH)
+    policy: SpeechPolicy | None = None
 
 
 class SpeakResponse(BaseModel):
     ok: bool
+    status: Literal["sent", "superseded"] = "sent"
+
+
+class StreamSpeakResponse(BaseModel):
+    ok: bool
+    fragments: int
+    chars: int
+    firstFragmentMs: float | None
+    elapsedMs: float
+
+
+class BroadcastMessage(BaseModel):
+    room: str = Field(..., min_length=1)
+    text: str = Field(..., min_length=1, max_length=MAX_SPEAK_TEXT_LENGTH)
+
+
+class BroadcastSpeakRequest(TTSSelection):
+    rooms: list[str] = Field(default_factory=list, max_length=1000)
+    text: str | None = Field(default=None, min_length=1, max_length=MAX_SPEAK_TEXT_LENGTH)
+    messages: list[BroadcastMessage] = Field(default_factory=list, max_length=1000)
+
+    @model_validator(mode="after")
+    def _check_targets(self) -> "BroadcastSpeakRequest":
+        if self.rooms and self.text is None:
+            raise ValueError("text is required when rooms are given")
+        if not self.rooms and not self.messages:
+            raise ValueError("rooms or messages must not be empty")
+        return self
+
+    def pairs(self) -> list[tuple[str, str]]:
+        pairs = [(room, self.text) for room in self.rooms] if self.text is not None else []
+        pairs.extend((message.room, message.text) for message in self.messages)
+        return pairs
+
+
+class BroadcastRoomResult(BaseModel):
+    room: str
+    ok: bool
+    elapsedMs: float
+    error: str | None = None
+
+
+class BroadcastSpeakResponse(BaseModel):
+    ok: bool
+    sent: int
+    failed: int
+    elapsedMs: float
+    results: list[BroadcastRoomResult]
+
+
+class CoalescerStatsResponse(BaseModel):
+    enabled: bool
+    activeRooms: int
+    pending: int
+    requests: int
+    sent: int
+    superseded: int
+    failed: int
+    rejected: int
+
+
+class PoolStatsResponse(BaseModel):
+    enabled: bool
+    targetSize: int
+    size: int
+    pending: int
+    hits: int
+    misses: int
+    dispatched: int
+    evicted: int
+    failures: int
+
+
+class TokenBatchRequest(BaseModel):
+    room: str | None = Field(default=None, min_length=1)
+    identities: list[str] = Field(default_factory=list, max_length=10000)
+    count: int = Field(default=0, ge=0, le=10000)
+    rooms: list[str] = Field(default_factory=list, max_length=10000)
+
+    @model_validator(mode="after")
+    def _check_targets(self) -> "TokenBatchRequest":
+        if (self.identities or self.count) and self.room is None:
+            raise ValueError("room is required when identities or count are given")
+        total = len(self.identities) + self.count + len(self.rooms)
+        if total == 0:
+            raise ValueError("nothing to mint")
+        if total > 10000:
+            raise ValueError("at most 10000 tokens per request")
+        return self
+
+
+class MintedToken(BaseModel):
+    roomName: str
+    identity: str
+    token: str
+
+
+class TokenBatchResponse(BaseModel):
+    livekitUrl: str
+    elapsedMs: float
+    tokens: list[MintedToken]
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from .config import get_settings
+from .dispatch import dispatch_agent
+from .livekit_rooms import delete_room, new_room_name
+from .metrics import WARM_POOL_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+MAX_REFILL_BACKOFF = 30.0
+
+
+@dataclass
+class WarmRoom:
+    name: str
+    created_at: float
+
+
+@dataclass
+class PoolStats:
+    hits: int = 0
+    misses: int = 0
+    dispatched: int = 0
+    evicted: int = 0
+    failures: int = 0
+
+
+class WarmRoomPool:
+    def __init__(
+        self,
+        target_size: int,
+        max_age: float,
+        refill_concurrency: int,
+        dispatch: Callable[[str], Awaitable[None]] = dispatch_agent,
+        release: Callable[[str], Awaitable[None]] | None = delete_room,
+    ) -> None:
+        self.target_size = target_size
+        self.max_age = max_age
+        self.refill_concurrency = max(1, refill_concurrency)
+        self.stats = PoolStats()
+        self._dispatch = dispatch
+        self._release = release
+        self._rooms: deque[WarmRoom] = deque()
+        self._pending = 0
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._background: set[asyncio.Task[None]] = set()
+        self._backoff = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self._rooms)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Warm room pool started target=%s max_age=%.0fs", self.target_size, self.max_age)
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        for pending in list(self._background):
+            pending.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        rooms = [room.name for room in self._rooms]
+        self._rooms.clear()
+        await asyncio.gather(*(self._release_room(name) for name in rooms))
+
+    def acquire(self) -> str | None:
+        self._evict_expired()
+        room = self._rooms.popleft() if self._rooms else None
+        self._wakeup.set()
+        if room is None:
+            self.stats.misses += 1
+            WARM_POOL_REQUESTS.labels("miss").inc()
+            return None
+        self.stats.hits += 1
+        WARM_POOL_REQUESTS.labels("hit").inc()
+        return room.name
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        while self._rooms and now - self._rooms[0].created_at >= self.max_age:
+            room = self._rooms.popleft()
+            self.stats.evicted += 1
+            self._spawn(self._release_room(room.name))
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _release_room(self, room_name: str) -> None:
+        if self._release is None:
+            return
+        try:
+            await self._release(room_name)
+        except Exception:
+            logger.exception("Failed to release warm room %s", room_name)
+
+    async def _fill_one(self) -> None:
+        room_name = new_room_name()
+        try:
+            await self._dispatch(room_name)
+        except Exception:
+            self.stats.failures += 1
+            self._backoff = min(MAX_REFILL_BACKOFF, max(0.5, self._backoff * 2))
+            logger.exception("Warm pool dispatch failed for room %s", room_name)
+        else:
+            self.stats.dispatched += 1
+            self._backoff = 0.0
+            self._rooms.append(WarmRoom(name=room_name, created_at=time.monotonic()))
+        finally:
+            self._pending -= 1
+            self._wakeup.set()
+
+    def _next_deadline(self) -> float | None:
+        if not self._rooms:
+            return None
+        return max(0.0, self._rooms[0].created_at + self.max_age - time.monotonic())
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            self._evict_expired()
+            if self._backoff:
+                await asyncio.sleep(self._backoff)
+            deficit = self.target_size - len(self._rooms) - self._pending
+            slots = self.refill_concurrency - self._pending
+            for _ in range(max(0, min(deficit, slots))):
+                self._pending += 1
+                self._spawn(self._fill_one())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._next_deadline())
+            except asyncio.TimeoutError:
+                pass
+
+
+_pool: WarmRoomPool | None = None
+
+
+def get_room_pool() -> WarmRoomPool | None:
+    return _pool
+
+
+async def start_room_pool() -> WarmRoomPool | None:
+    global _pool
+    settings = get_settings()
+    if settings.warm_pool_size <= 0:
+        return None
+    if _pool is None:
+        _pool = WarmRoomPool(
+            target_size=settings.warm_pool_size,
+            max_age=settings.warm_pool_max_age,
+            refill_concurrency=settings.warm_pool_refill_concurrency,
+        )
+        _pool.start()
+    return _pool
+
+
+async def close_room_pool() -> None:
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        await pool.stop()
@@ -0,0 +1,217 @@
+import asyncio
+import heapq
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+SQLITE_PRUNE_INTERVAL = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    room_name TEXT PRIMARY KEY,
+    identity TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at);
+"""
+
+
+@dataclass
+class SessionRecord:
+    room_name: str
+    identity: str
+    created_at: float
+    expires_at: float
+    speak_count: int = 0
+    last_speak_at: float | None = None
+
+
+class SessionStore:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One connection per process; WAL lets every uvicorn worker read while one writes.
+        self._conn = sqlite3.connect(path, timeout=1.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._pruned_at = 0.0
+
+    def put(self, record: SessionRecord) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (room_name, identity, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (record.room_name, record.identity, record.created_at, record.expires_at),
+            )
+
+    def get(self, room_name: str, now: float) -> SessionRecord | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT room_name, identity, created_at, expires_at FROM sessions"
+                " WHERE room_name = ? AND expires_at > ?",
+                (room_name, now),
+            ).fetchone()
+        return SessionRecord(*row) if row is not None else None
+
+    def active(self, now: float, limit: int) -> list[SessionRecord]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT room_name, identity, created_at, expires_at FROM sessions"
+                " WHERE expires_at > ? ORDER BY created_at DESC LIMIT ?",
+                (now, limit),
+            ).fetchall()
+        return [SessionRecord(*row) for row in rows]
+
+    def delete(self, room_name: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE room_name = ?", (room_name,))
+
+    def prune(self, now: float) -> None:
+        if now - self._pruned_at < SQLITE_PRUNE_INTERVAL:
+            return
+        self._pruned_at = now
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SessionRegistry:
+    def __init__(self, ttl: float, store: SessionStore | None = None) -> None:
+        self.ttl = ttl
+        self.store = store
+        # Records read from the shared file expire on their own schedule, so expiries are
+        # kept in a heap rather than relying on insertion order.
+        self._records: dict[str, SessionRecord] = {}
+        self._expiries: list[tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        self._prune(time.time())
+        return len(self._records)
+
+    async def register(self, room_name: str, identity: str) -> SessionRecord:
+        now = time.time()
+        self._prune(now)
+        record = self._records.get(room_name)
+        if record is None:
+            record = SessionRecord(room_name=room_name, identity=identity, created_at=now, expires_at=now + self.ttl)
+        else:
+            record.expires_at = now + self.ttl
+        self._track(record)
+        if self.store is not None:
+            # SQLite may wait on another worker's write lock; keep that off the event loop.
+            try:
+                await asyncio.to_thread(self._persist, record, now)
+            except sqlite3.Error:
+                logger.exception("Failed to persist session %s", room_name)
+        return record
+
+    def _persist(self, record: SessionRecord, now: float) -> None:
+        self.store.put(record)
+        self.store.prune(now)
+
+    async def get(self, room_name: str) -> SessionRecord | None:
+        now = time.time()
+        record = self._records.get(room_name)
+        if record is not None:
+            if record.expires_at > now:
+                return record
+            del self._records[room_name]
+            return None
+        if self.store is None:
+            return None
+        # Sessions created by another worker are only known through the shared file.
+        try:
+            record = await asyncio.to_thread(self.store.get, room_name, now)
+        except sqlite3.Error:
+            logger.exception("Failed to read session %s", room_name)
+            return None
+        if record is None:
+            return None
+        # Another request may have cached the same room while this one read the file.
+        cached = self._records.get(room_name)
+        if cached is not None:
+            return cached
+        self._track(record)
+        return record
+
+    def record_speak(self, room_name: str) -> None:
+        # Speak counts are kept in this worker's memory only; they are not written to SQLite.
+        record = self._records.get(room_name)
+        if record is not None:
+            record.speak_count += 1
+            record.last_speak_at = time.time()
+
+    async def active(self, limit: int = 100) -> list[SessionRecord]:
+        now = time.time()
+        self._prune(now)
+        if self.store is None:
+            return self._list_local(now, limit)
+        try:
+            records = await asyncio.to_thread(self.store.active, now, limit)
+        except sqlite3.Error:
+            logger.exception("Failed to list sessions")
+            return self._list_local(now, limit)
+        # Speak counts are tracked per worker; merge in what this worker has seen.
+        return [self._records.get(record.room_name, record) for record in records]
+
+    def _list_local(self, now: float, limit: int) -> list[SessionRecord]:
+        records = [record for record in self._records.values() if record.expires_at > now]
+        records.sort(key=lambda record: record.created_at, reverse=True)
+        return records[:limit]
+
+    async def remove(self, room_name: str) -> None:
+        self._records.pop(room_name, None)
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.delete, room_name)
+            except sqlite3.Error:
+                logger.exception("Failed to delete session %s", room_name)
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+
+    def _track(self, record: SessionRecord) -> None:
+        self._records[record.room_name] = record
+        heapq.heappush(self._expiries, (record.expires_at, record.room_name))
+
+    def _prune(self, now: float) -> None:
+        while self._expiries and self._expiries[0][0] <= now:
+            expires_at, room_name = heapq.heappop(self._expiries)
+            record = self._records.get(room_name)
+            # A renewed session left an older heap entry behind; only the current expiry counts.
+            if record is not None and record.expires_at <= now:
+                del self._records[room_name]
+
+
+_registry: SessionRegistry | None = None
+
+
+def get_session_registry() -> SessionRegistry:
+    global _registry
+    if _registry is None:
+        settings = get_settings()
+        store = SessionStore(settings.session_registry_path) if settings.session_registry_path else None
+        _registry = SessionRegistry(ttl=settings.session_ttl, store=store)
+    return _registry
+
+
+def close_session_registry() -> None:
+    global _registry
+    registry, _registry = _registry, None
+    if registry is not None:
+        registry.close()
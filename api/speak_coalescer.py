@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from .config import get_settings
+from .livekit_send import send_text_to_room
+from .metrics import SPEAK_COALESCER_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+SENT = "sent"
+SUPERSEDED = "superseded"
+
+
+class CoalescerFull(Exception):
+    pass
+
+
+@dataclass
+class _PendingSend:
+    text: str
+    policy: str | None
+    options: dict[str, Any] | None
+    future: "asyncio.Future[str]"
+
+
+@dataclass
+class _RoomSlot:
+    pending: deque[_PendingSend] = field(default_factory=deque)
+    task: asyncio.Task[None] | None = None
+
+
+@dataclass
+class CoalescerStats:
+    requests: int = 0
+    sent: int = 0
+    superseded: int = 0
+    failed: int = 0
+    rejected: int = 0
+
+
+class SpeakCoalescer:
+    def __init__(
+        self,
+        send: Callable[[str, str, str | None, dict[str, Any] | None], Awaitable[None]] = send_text_to_room,
+        max_pending: int = 32,
+    ) -> None:
+        # Only enqueue sends wait behind each other, so max_pending bounds a stalled room's backlog.
+        self.stats = CoalescerStats()
+        self.max_pending = max_pending
+        self._send = send
+        self._slots: dict[str, _RoomSlot] = {}
+
+    @property
+    def active_rooms(self) -> int:
+        return len(self._slots)
+
+    @property
+    def pending(self) -> int:
+        return sum(len(slot.pending) for slot in self._slots.values())
+
+    async def submit(
+        self,
+        room_name: str,
+        text: str,
+        policy: str | None = None,
+        options: dict[str, Any] | None = None,
+    ) -> str:
+        self.stats.requests += 1
+        slot = self._slots.get(room_name)
+        if slot is None:
+            slot = self._slots[room_name] = _RoomSlot()
+        if policy != "enqueue":
+            # Mirrors the agent: anything but an enqueue drops speech that is still
+            # waiting, so waiting sends to this room would be discarded on arrival anyway.
+            while slot.pending:
+                self._resolve(slot.pending.popleft(), SUPERSEDED)
+        elif self.max_pending > 0 and len(slot.pending) >= self.max_pending:
+            self.stats.rejected += 1
+            SPEAK_COALESCER_REQUESTS.labels("rejected").inc()
+            raise CoalescerFull(room_name)
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        slot.pending.append(_PendingSend(text, policy, options, future))
+        if slot.task is None:
+            slot.task = asyncio.create_task(self._drain(room_name, slot))
+        # A client that goes away does not take its send down with it.
+        return await asyncio.shield(future)
+
+    def _resolve(self, send: _PendingSend, result: str) -> None:
+        if result == SUPERSEDED:
+            self.stats.superseded += 1
+        SPEAK_COALESCER_REQUESTS.labels(result).inc()
+        if not send.future.done():
+            send.future.set_result(result)
+
+    async def _drain(self, room_name: str, slot: _RoomSlot) -> None:
+        try:
+            while slot.pending:
+                send = slot.pending.popleft()
+                try:
+                    await self._send(room_name, send.text, send.policy, send.options)
+                except asyncio.CancelledError:
+                    send.future.cancel()
+                    raise
+                except Exception as exc:
+                    self.stats.failed += 1
+                    SPEAK_COALESCER_REQUESTS.labels("failed").inc()
+                    if not send.future.done():
+                        send.future.set_exception(exc)
+                    continue
+                self.stats.sent += 1
+                self._resolve(send, SENT)
+        finally:
+            slot.task = None
+            if not slot.pending and self._slots.get(room_name) is slot:
+                del self._slots[room_name]
+
+    async def stop(self) -> None:
+        slots, self._slots = list(self._slots.values()), {}
+        tasks = []
+        for slot in slots:
+            while slot.pending:
+                send = slot.pending.popleft()
+                if not send.future.done():
+                    send.future.set_exception(RuntimeError("speak coalescer stopped"))
+            if slot.task is not None:
+                slot.task.cancel()
+                tasks.append(slot.task)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_coalescer: SpeakCoalescer | None = None
+
+
+def get_speak_coalescer() -> SpeakCoalescer | None:
+    global _coalescer
+    settings = get_settings()
+    if _coalescer is None and settings.speak_coalesce:
+        _coalescer = SpeakCoalescer(max_pending=settings.speak_coalesce_max_pending)
+    return _coalescer
+
+
+async def close_speak_coalescer() -> None:
+    global _coalescer
+    coalescer, _coalescer = _coalescer, None
+    if coalescer is not None:
+        await coalescer.stop()
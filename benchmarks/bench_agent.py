@@ -0,0 +1,236 @@
+"""Offline agent benchmark: speech latency, interrupts, task backlog and memory under packet load.
+
+Run with ``python -m benchmarks.bench_agent --rooms 1,10,50 --rate 2 --duration 20``.
+
+Every room runs ``agent.main.entrypoint`` against an in-process fake room, a
+deterministic fake TTS and a no-op avatar, so no LiveKit, OpenAI or Tavus access is
+needed. Speak packets are encoded with the real protocol and delivered through the
+room's ``data_received`` handler. All rooms share one process, spread over
+``--threads`` event loops as with ``AGENT_JOB_EXECUTOR=thread``. Each value of
+``--rooms`` is a separate step, so a sweep shows where a worker stops keeping up.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import platform
+import random
+import subprocess
+import threading
+import time
+from typing import Any
+
+from .bench_env import use_bench_env
+
+# Unique texts never hit the cache; keep it out of the way unless asked for.
+use_bench_env(TTS_CACHE_MEMORY_BYTES="0")
+
+from agent.load import process_memory  # noqa: E402
+from agent.main import entrypoint  # noqa: E402
+from shared.protocol import encode_speak  # noqa: E402
+
+from .fake_agent import FakeJobContext, FakeRoom, FakeTTS, Recorder, install_fakes, wait_joined  # noqa: E402
+
+MIB = 1024 * 1024
+FILLER = "This sentence stands in for the text a producer would ask the avatar to say."
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _latency_summary(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "p50_ms": round(_percentile(ordered, 0.50) * 1e3, 2),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1e3, 2),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1e3, 2),
+        "max_ms": round(ordered[-1] * 1e3, 2),
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class LoopMonitor:
+    # Samples pending tasks, event-loop lag and process memory while the rooms run.
+    def __init__(self, interval: float = 0.1) -> None:
+        self.interval = interval
+        self.tasks: list[int] = []
+        self.lags: list[float] = []
+        self.peak_memory = 0
+        self._lock = threading.Lock()
+
+    async def run(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - started - self.interval)
+            tasks = len(asyncio.all_tasks())
+            memory = process_memory()
+            with self._lock:
+                self.lags.append(lag)
+                self.tasks.append(tasks)
+                self.peak_memory = max(self.peak_memory, memory)
+
+
+async def _drive(room: FakeRoom, index: int, args: argparse.Namespace, recorder: Recorder, deadline: float) -> None:
+    rng = random.Random(args.seed + index)
+    filler = " ".join([FILLER] * args.sentences)
+    seq = 0
+    # Rooms start out of phase so their bursts do not line up.
+    await asyncio.sleep(rng.uniform(0, 1.0 / args.rate))
+    while time.monotonic() < deadline:
+        for _ in range(args.burst):
+            seq += 1
+            text = f"Room {index} message {seq}. {filler}"
+            recorder.packet_sent(text)
+            for packet in encode_speak(text, seq=seq, policy=args.policy):
+                room.send_packet(packet)
+        await asyncio.sleep(rng.expovariate(args.rate) if args.poisson else 1.0 / args.rate)
+
+
+async def _run_loop(indices: list[int], args: argparse.Namespace, recorder: Recorder, monitor: LoopMonitor) -> list:
+    sampler = asyncio.create_task(monitor.run())
+    rooms = [FakeRoom(f"bench-room-{index}", recorder) for index in indices]
+    jobs = []
+    startup: list[float] = []
+    for room in rooms:
+        tts = FakeTTS(args.first_byte_delay, args.frame_rate, args.ms_per_char)
+        ctx = FakeJobContext(room, {"tts": tts}, args.connect_delay)
+        jobs.append(asyncio.create_task(entrypoint(ctx)))
+    started = time.perf_counter()
+    for room, job in zip(rooms, jobs):
+        await wait_joined(room, job, args.startup_timeout)
+        startup.append(time.perf_counter() - started)
+
+    deadline = time.monotonic() + args.duration
+    await asyncio.gather(*(_drive(room, index, args, recorder, deadline) for room, index in zip(rooms, indices)))
+    # Let queued speech drain before the rooms disconnect.
+    await asyncio.sleep(args.drain)
+    for room in rooms:
+        room.disconnect()
+    await asyncio.wait(jobs, timeout=args.startup_timeout)
+    sampler.cancel()
+    return startup
+
+
+def run_step(rooms: int, args: argparse.Namespace) -> dict:
+    recorder = Recorder()
+    monitor = LoopMonitor()
+    baseline = process_memory()
+    threads = max(1, min(args.threads, rooms))
+    groups = [list(range(first, rooms, threads)) for first in range(threads)]
+    startup: list[float] = []
+    errors: list[BaseException] = []
+
+    def target(indices: list[int]) -> None:
+        try:
+            startup.extend(asyncio.run(_run_loop(indices, args, recorder, monitor)))
+        except BaseException as exc:
+            errors.append(exc)
+
+    workers = [threading.Thread(target=target, args=(group,)) for group in groups]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+
+    peak = max(monitor.peak_memory, process_memory())
+    tasks = monitor.tasks or [0]
+    return {
+        "rooms": rooms,
+        "threads": threads,
+        "sent": recorder.sent,
+        "said": recorder.said,
+        "dropped": recorder.sent - recorder.said,
+        "completed": recorder.completed,
+        "interrupted": recorder.interrupted,
+        "interrupt_calls": recorder.interrupt_calls,
+        "startup": _latency_summary(startup),
+        "receive_to_say": _latency_summary(recorder.receive_to_say),
+        "say_to_first_frame": _latency_summary(recorder.say_to_first_frame),
+        "receive_to_first_frame": _latency_summary(recorder.receive_to_first_frame),
+        "loop_lag": _latency_summary(monitor.lags),
+        "tasks": {"max": max(tasks), "mean": round(sum(tasks) / len(tasks), 1)},
+        "memory": {
+            "baseline_mib": round(baseline / MIB, 1),
+            "peak_mib": round(peak / MIB, 1),
+            "per_room_mib": round(max(0, peak - baseline) / rooms / MIB, 2),
+        },
+    }
+
+
+def _print(results: list[dict], slo_ms: float) -> None:
+    header = ("rooms", "sent", "said", "intr", "say p95", "frame p95", "e2e p50", "e2e p95", "lag p95", "tasks")
+    header += ("MiB/room",)
+    print("{:>6} {:>7} {:>7} {:>6} {:>9} {:>9} {:>9} {:>9} {:>9} {:>6} {:>9}".format(*header))
+    for result in results:
+        e2e = result["receive_to_first_frame"]
+        print(
+            f"{result['rooms']:>6} {result['sent']:>7} {result['said']:>7} {result['interrupted']:>6} "
+            f"{result['receive_to_say'].get('p95_ms', '-'):>9} {result['say_to_first_frame'].get('p95_ms', '-'):>9} "
+            f"{e2e.get('p50_ms', '-'):>9} {e2e.get('p95_ms', '-'):>9} {result['loop_lag'].get('p95_ms', '-'):>9} "
+            f"{result['tasks']['max']:>6} {result['memory']['per_room_mib']:>9}"
+        )
+    if slo_ms > 0:
+        passing = [r["rooms"] for r in results if r["receive_to_first_frame"].get("p95_ms", math.inf) <= slo_ms]
+        print(f"largest room count with p95 receive-to-first-frame <= {slo_ms:g} ms: {max(passing, default='none')}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", default="1,10", help="comma-separated room counts, one step each")
+    parser.add_argument("--threads", type=int, default=1, help="event loops the rooms are spread over")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--drain", type=float, default=2.0, help="seconds to let queued speech finish")
+    parser.add_argument("--rate", type=float, default=1.0, help="speak bursts per room per second")
+    parser.add_argument("--burst", type=int, default=1, help="packets per burst")
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-burst times")
+    parser.add_argument("--policy", default=None, help="interrupt, enqueue or coalesce; default SPEECH_POLICY")
+    parser.add_argument("--sentences", type=int, default=1, help="filler sentences per message")
+    parser.add_argument("--first-byte-delay", type=float, default=0.2, help="fake TTS time to first frame")
+    parser.add_argument("--frame-rate", type=float, default=200.0, help="fake TTS frames per second; 50 is real time")
+    parser.add_argument("--ms-per-char", type=float, default=60.0, help="audio produced per character of text")
+    parser.add_argument("--connect-delay", type=float, default=0.0)
+    parser.add_argument("--avatar-delay", type=float, default=0.0)
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    parser.add_argument("--slo-ms", type=float, default=0.0, help="report the largest step within this p95")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--log-level", default="WARNING", help="level for the agent's own loggers")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    logging.getLogger("agent").setLevel(args.log_level.upper())
+    install_fakes(args.avatar_delay)
+    results = [run_step(int(count), args) for count in args.rooms.split(",") if count]
+    _print(results, args.slo_ms)
+    if args.output:
+        report: dict[str, Any] = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "args": vars(args),
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""Open-loop load test of the API against a local LiveKit stand-in.
+
+Run with ``python -m benchmarks.bench_api_load --rps 200 --duration 30 --output results.json``.
+
+The API runs under uvicorn in a subprocess, and the fake room and agent-dispatch
+services run in a second process with the injected latency and error rates.
+Requests are fired on a fixed schedule whether or not earlier ones have finished.
+Latency is measured from each request's scheduled send time, so a slow server
+cannot hide its queueing delay by slowing down the load generator.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import aiohttp
+
+from .fake_livekit import FakeLiveKitServer
+
+ENDPOINTS = ("session", "speak", "broadcast", "status")
+
+
+def _parse_pairs(values: list[str], cast: Any = str) -> dict[str, Any]:
+    pairs = {}
+    for value in values:
+        key, sep, raw = value.partition("=")
+        if not sep:
+            raise SystemExit(f"expected KEY=VALUE, got {value!r}")
+        pairs[key] = cast(raw)
+    return pairs
+
+
+def _serve_fake(options: dict, conn: Any) -> None:
+    async def serve() -> None:
+        server = FakeLiveKitServer(**options)
+        await server.start()
+        conn.send(server.port)
+        # Serve until the parent asks for the final stats.
+        await asyncio.get_running_loop().run_in_executor(None, conn.recv)
+        conn.send(server.stats.as_dict())
+        await server.stop()
+
+    asyncio.run(serve())
+
+
+def _free_port(host: str) -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+@dataclass
+class EndpointStats:
+    sent: int = 0
+    completed: int = 0
+    ok: int = 0
+    statuses: dict[str, int] = field(default_factory=dict)
+    latencies: list[float] = field(default_factory=list)
+
+    def record(self, status: str, latency: float) -> None:
+        self.completed += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status.startswith("2"):
+            self.ok += 1
+        self.latencies.append(latency)
+
+    def summary(self, elapsed: float) -> dict:
+        ordered = sorted(self.latencies)
+        result: dict[str, Any] = {
+            "sent": self.sent,
+            "completed": self.completed,
+            "ok": self.ok,
+            "errors": self.completed - self.ok,
+            "statuses": dict(sorted(self.statuses.items())),
+            "throughput_rps": round(self.ok / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+        if ordered:
+            result.update(
+                mean_ms=round(sum(ordered) / len(ordered) * 1e3, 3),
+                p50_ms=round(_percentile(ordered, 0.50) * 1e3, 3),
+                p95_ms=round(_percentile(ordered, 0.95) * 1e3, 3),
+                p99_ms=round(_percentile(ordered, 0.99) * 1e3, 3),
+                max_ms=round(ordered[-1] * 1e3, 3),
+            )
+        return result
+
+
+class LoadGenerator:
+    def __init__(self, session: aiohttp.ClientSession, base_url: str, rooms: list[str], args: argparse.Namespace):
+        self.session = session
+        self.base_url = base_url
+        self.rooms = rooms
+        self.args = args
+        self.stats = {name: EndpointStats() for name in ENDPOINTS}
+        self.dropped = 0
+        self._random = random.Random(args.seed)
+        self._inflight = 0
+
+    def _request(self, endpoint: str) -> tuple[str, str, Any]:
+        room = self._random.choice(self.rooms) if self.rooms else "room-missing"
+        if endpoint == "session":
+            return "POST", "/session", None
+        if endpoint == "speak":
+            return "POST", f"/rooms/{room}/speak", {"text": self.args.text, "policy": self.args.policy}
+        if endpoint == "broadcast":
+            count = min(len(self.rooms), self.args.broadcast_rooms) or 1
+            rooms = self._random.sample(self.rooms, count) if self.rooms else [room]
+            return "POST", "/rooms/speak", {"rooms": rooms, "text": self.args.text}
+        return "GET", f"/sessions/{room}/status", None
+
+    async def _fire(self, endpoint: str, scheduled: float) -> None:
+        method, path, body = self._request(endpoint)
+        try:
+            async with self.session.request(method, self.base_url + path, json=body) as response:
+                await response.read()
+                status = str(response.status)
+        except Exception as exc:
+            status = f"exception:{type(exc).__name__}"
+        finally:
+            self._inflight -= 1
+        self.stats[endpoint].record(status, time.perf_counter() - scheduled)
+
+    async def run(self, rps: float, duration: float, mix: dict[str, float], poisson: bool) -> float:
+        names = [name for name in ENDPOINTS if mix.get(name, 0) > 0]
+        weights = [mix[name] for name in names]
+        tasks: set[asyncio.Task[None]] = set()
+        started = time.perf_counter()
+        scheduled = started
+        end = started + duration
+        while True:
+            scheduled += self._random.expovariate(rps) if poisson else 1.0 / rps
+            if scheduled >= end:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self._inflight >= self.args.max_inflight:
+                self.dropped += 1
+                continue
+            endpoint = self._random.choices(names, weights)[0]
+            self.stats[endpoint].sent += 1
+            self._inflight += 1
+            task = asyncio.create_task(self._fire(endpoint, scheduled))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.wait(tasks, timeout=self.args.drain_timeout)
+        return time.perf_counter() - started
+
+
+async def _wait_ready(session: aiohttp.ClientSession, base_url: str, api: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if api.poll() is not None:
+            raise SystemExit(f"API exited during startup with code {api.returncode}")
+        try:
+            async with session.get(base_url + "/health") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.1)
+    raise SystemExit("API did not become ready")
+
+
+async def _create_rooms(session: aiohttp.ClientSession, base_url: str, count: int) -> list[str]:
+    rooms = []
+    for _ in range(count):
+        async with session.post(base_url + "/session") as response:
+            if response.status == 200:
+                rooms.append((await response.json())["roomName"])
+    return rooms
+
+
+async def run(args: argparse.Namespace) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe()
+    fake_options = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "method_latency": _parse_pairs(args.method_latency, float),
+        "method_error_rate": _parse_pairs(args.method_error_rate, float),
+    }
+    fake = ctx.Process(target=_serve_fake, args=(fake_options, child), daemon=True)
+    fake.start()
+    fake_port = parent.recv()
+
+    port = _free_port(args.host)
+    env = dict(os.environ)
+    env.update(
+        LIVEKIT_URL=f"http://127.0.0.1:{fake_port}",
+        LIVEKIT_API_KEY="bench-key",
+        LIVEKIT_API_SECRET="bench-secret-bench-secret-bench-secret",
+        AGENT_NAME="bench-agent",
+    )
+    env.update(_parse_pairs(args.api_env))
+    command = [sys.executable, "-m", "uvicorn", "api.main:app", "--host", args.host, "--port", str(port)]
+    command += ["--workers", str(args.workers), "--log-level", "warning"]
+    api = subprocess.Popen(command, env=env)
+    base_url = f"http://{args.host}:{port}"
+
+    connector = aiohttp.TCPConnector(limit=args.max_inflight)
+    timeout = aiohttp.ClientTimeout(total=args.request_timeout)
+    try:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            await _wait_ready(session, base_url, api, args.startup_timeout)
+            rooms = await _create_rooms(session, base_url, args.rooms)
+            generator = LoadGenerator(session, base_url, rooms, args)
+            mix = _parse_pairs(args.mix.split(","), float)
+            elapsed = await generator.run(args.rps, args.duration, mix, args.poisson)
+    finally:
+        api.terminate()
+        try:
+            api.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            api.kill()
+        parent.send("stop")
+        fake_stats = parent.recv() if parent.poll(10) else None
+        fake.join(timeout=10)
+
+    endpoints = {name: stats.summary(elapsed) for name, stats in generator.stats.items() if stats.sent}
+    overall = EndpointStats()
+    for stats in generator.stats.values():
+        overall.sent += stats.sent
+        for status, count in stats.statuses.items():
+            overall.statuses[status] = overall.statuses.get(status, 0) + count
+        overall.completed += stats.completed
+        overall.ok += stats.ok
+        overall.latencies.extend(stats.latencies)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "args": vars(args),
+        },
+        "target_rps": args.rps,
+        "offered_rps": round(overall.sent / elapsed, 2) if elapsed > 0 else 0.0,
+        "elapsed_s": round(elapsed, 3),
+        "rooms": len(rooms),
+        "dropped": generator.dropped,
+        "overall": overall.summary(elapsed),
+        "endpoints": endpoints,
+        "fake_livekit": fake_stats,
+    }
+
+
+def _print(results: dict) -> None:
+    print(
+        f"target={results['target_rps']}rps offered={results['offered_rps']}rps "
+        f"elapsed={results['elapsed_s']}s rooms={results['rooms']} dropped={results['dropped']}"
+    )
+    header = ("endpoint", "sent", "ok", "errors", "rps", "p50 ms", "p95 ms", "p99 ms", "max ms")
+    print("{:<10} {:>7} {:>7} {:>7} {:>9} {:>9} {:>9} {:>9} {:>9}".format(*header))
+    rows = dict(results["endpoints"], overall=results["overall"])
+    for name, row in rows.items():
+        print(
+            f"{name:<10} {row['sent']:>7} {row['ok']:>7} {row['errors']:>7} {row['throughput_rps']:>9} "
+            f"{row.get('p50_ms', '-'):>9} {row.get('p95_ms', '-'):>9} {row.get('p99_ms', '-'):>9} "
+            f"{row.get('max_ms', '-'):>9}"
+        )
+        failures = {status: count for status, count in row["statuses"].items() if not status.startswith("2")}
+        if failures:
+            print(f"{'':<10} {failures}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=100.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--mix", default="session=1,speak=4", help="endpoint weights, e.g. session=1,speak=4")
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times")
+    parser.add_argument("--rooms", type=int, default=32, help="sessions created before the run for speak targets")
+    parser.add_argument("--broadcast-rooms", type=int, default=8)
+    parser.add_argument("--text", default="Load test message for the room.")
+    parser.add_argument("--policy", default="interrupt")
+    parser.add_argument("--latency", type=float, default=0.005, help="fake LiveKit latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--method-latency", action="append", default=[], help="e.g. CreateDispatch=0.2")
+    parser.add_argument("--method-error-rate", action="append", default=[], help="e.g. SendData=0.01")
+    parser.add_argument("--api-env", action="append", default=[], help="API environment, e.g. SPEAK_COALESCE=true")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--max-inflight", type=int, default=1000)
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    for name in _parse_pairs(args.mix.split(",")):
+        if name not in ENDPOINTS:
+            raise SystemExit(f"unknown endpoint {name!r}, expected one of: {', '.join(ENDPOINTS)}")
+
+    results = asyncio.run(run(args))
+    _print(results)
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
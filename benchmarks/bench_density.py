@@ -0,0 +1,257 @@
+"""Rooms-per-GB and rooms-per-core for process and thread job execution.
+
+Run with ``python -m benchmarks.bench_density --rooms 20``.
+
+Every room runs the real ``agent.main.entrypoint`` after the real ``prewarm``, so it
+carries the same state as in production: OpenAI client and warmer, speech scheduler,
+TTS cache, load reporter and per-loop TTS clients. Only LiveKit, the TTS provider and
+the Tavus avatar are replaced with the fakes from ``benchmarks/fake_agent.py``. Each
+room is sent a short phrase every few seconds; phrases repeat, so the TTS cache serves
+some of them.
+
+In ``process`` mode each room gets its own interpreter, as with the default job
+executor. In ``thread`` mode all rooms run as threads of one process, each on its own
+event loop, as with ``AGENT_JOB_EXECUTOR=thread``. Memory is proportional set size
+(PSS), so pages shared between processes are split fairly; CPU is user plus system
+time over the measurement window. Linux only.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import threading
+import time
+
+from .bench_env import use_bench_env
+
+# A warmup utterance goes through the fake TTS; an empty one would ping OpenAI with prewarm's real client.
+use_bench_env(TTS_WARMUP_TEXT="Hello.")
+
+from agent.main import entrypoint  # noqa: E402
+from agent.prewarm import prewarm  # noqa: E402
+from shared.protocol import encode_speak  # noqa: E402
+
+from .fake_agent import (  # noqa: E402
+    FakeJobContext,
+    FakeJobProcess,
+    FakeRoom,
+    FakeTTS,
+    Recorder,
+    install_fakes,
+    wait_joined,
+)
+
+GIB = 1024**3
+MIB = 1024**2
+PHRASES = [
+    "Welcome back, let's pick up where we left off.",
+    "Here is the summary of today's session.",
+    "Please take a moment to review the next slide.",
+    "That completes the first section.",
+    "Let me know if you have any questions.",
+    "Thanks for joining, see you next time.",
+]
+
+
+async def _room(
+    index: int,
+    args: dict,
+    recorder: Recorder,
+    joined: threading.Semaphore,
+    stop: "multiprocessing.synchronize.Event",
+) -> None:
+    room = FakeRoom(f"density-room-{index}", recorder)
+    try:
+        # The real prewarm builds the room's OpenAI client and warmer; only the provider is faked.
+        userdata: dict = {}
+        prewarm(FakeJobProcess(userdata))
+        userdata["tts"] = FakeTTS(args["first_byte_delay"], args["frame_rate"], args["ms_per_char"])
+        job = asyncio.create_task(entrypoint(FakeJobContext(room, userdata, args["connect_delay"])))
+        await wait_joined(room, job, args["startup_timeout"])
+    finally:
+        joined.release()
+
+    rng = random.Random(index)
+    seq = 0
+    # Rooms start out of phase so their speech does not line up.
+    await asyncio.sleep(rng.uniform(0, args["speak_interval"]))
+    while not stop.is_set():
+        seq += 1
+        recorder.add("sent")
+        for packet in encode_speak(rng.choice(PHRASES), seq=seq):
+            room.send_packet(packet)
+        await asyncio.sleep(args["speak_interval"])
+    room.disconnect()
+    await asyncio.wait({job}, timeout=args["startup_timeout"])
+
+
+def _job_process(
+    first: int,
+    count: int,
+    args: dict,
+    ready: "multiprocessing.Queue",
+    results: "multiprocessing.Queue",
+    stop: "multiprocessing.synchronize.Event",
+) -> None:
+    logging.getLogger("agent").setLevel(args["log_level"])
+    install_fakes(args["avatar_delay"])
+    recorder = Recorder()
+    joined = threading.Semaphore(0)
+    errors: list[str] = []
+
+    def target(index: int) -> None:
+        try:
+            asyncio.run(_room(index, args, recorder, joined, stop))
+        except BaseException as exc:
+            errors.append(repr(exc))
+
+    threads = [threading.Thread(target=target, args=(first + i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for _ in threads:
+        joined.acquire()
+    ready.put((os.getpid(), list(errors)))
+    for thread in threads:
+        thread.join()
+    results.put(
+        {
+            "sent": recorder.sent,
+            "said": recorder.said,
+            "completed": recorder.completed,
+            "interrupted": recorder.interrupted,
+            "errors": errors,
+        }
+    )
+
+
+def _pss(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as handle:
+            for line in handle:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except FileNotFoundError:
+        pass
+    with open(f"/proc/{pid}/status") as handle:
+        for line in handle:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as handle:
+        fields = handle.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def run_mode(mode: str, rooms: int, args: dict, warmup: float, window: float) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Queue()
+    results = ctx.Queue()
+    stop = ctx.Event()
+    if mode == "process":
+        groups = [(index, 1) for index in range(rooms)]
+    else:
+        groups = [(0, rooms)]
+    processes = [
+        ctx.Process(target=_job_process, args=(first, count, args, ready, results, stop)) for first, count in groups
+    ]
+    for process in processes:
+        process.start()
+    try:
+        # Spawned interpreters import the agent and LiveKit before their rooms can start.
+        started = [ready.get(timeout=args["startup_timeout"] + 120) for _ in processes]
+        errors = [error for _, process_errors in started for error in process_errors]
+        if errors:
+            raise RuntimeError(f"{len(errors)} rooms failed to start: {errors[0]}")
+        pids = [pid for pid, _ in started]
+        time.sleep(warmup)
+
+        cpu_before = sum(_cpu_seconds(pid) for pid in pids)
+        window_started = time.perf_counter()
+        time.sleep(window)
+        cpu = sum(_cpu_seconds(pid) for pid in pids) - cpu_before
+        elapsed = time.perf_counter() - window_started
+        memory = sum(_pss(pid) for pid in pids)
+
+        stop.set()
+        # Collect results before joining; a child exits only after its queue is flushed.
+        reports = [results.get(timeout=args["startup_timeout"] + args["speak_interval"]) for _ in processes]
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=args["startup_timeout"])
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+    cores = cpu / elapsed
+    return {
+        "mode": mode,
+        "rooms": rooms,
+        "processes": len(processes),
+        "sent": sum(report["sent"] for report in reports),
+        "said": sum(report["said"] for report in reports),
+        "completed": sum(report["completed"] for report in reports),
+        "interrupted": sum(report["interrupted"] for report in reports),
+        "errors": [error for report in reports for error in report["errors"]],
+        "memory_mib": round(memory / MIB, 1),
+        "memory_per_room_mib": round(memory / rooms / MIB, 2),
+        "rooms_per_gb": round(rooms / (memory / GIB), 1),
+        "cpu_cores": round(cores, 4),
+        "rooms_per_core": round(rooms / cores, 1) if cores > 0 else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--modes", default="process,thread")
+    parser.add_argument("--speak-interval", type=float, default=2.0, help="seconds between phrases per room")
+    parser.add_argument("--first-byte-delay", type=float, default=0.2, help="fake TTS time to first frame")
+    parser.add_argument("--frame-rate", type=float, default=200.0, help="fake TTS frames per second; 50 is real time")
+    parser.add_argument("--ms-per-char", type=float, default=60.0, help="audio produced per character of text")
+    parser.add_argument("--connect-delay", type=float, default=0.0)
+    parser.add_argument("--avatar-delay", type=float, default=0.0)
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--window", type=float, default=5.0)
+    parser.add_argument("--log-level", default="WARNING", help="level for the agent's own loggers")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    room_args = {
+        "speak_interval": args.speak_interval,
+        "first_byte_delay": args.first_byte_delay,
+        "frame_rate": args.frame_rate,
+        "ms_per_char": args.ms_per_char,
+        "connect_delay": args.connect_delay,
+        "avatar_delay": args.avatar_delay,
+        "startup_timeout": args.startup_timeout,
+        "log_level": args.log_level.upper(),
+    }
+    results = [
+        run_mode(mode, args.rooms, room_args, args.warmup, args.window) for mode in args.modes.split(",") if mode
+    ]
+    if args.json:
+        print(json.dumps({"results": results}, indent=2))
+        return
+    header = ("mode", "rooms", "procs", "said", "MiB", "MiB/room", "rooms/GB", "cores", "rooms/core")
+    print("{:<8} {:>5} {:>5} {:>6} {:>9} {:>9} {:>9} {:>7} {:>10}".format(*header))
+    for result in results:
+        print(
+            f"{result['mode']:<8} {result['rooms']:>5} {result['processes']:>5} {result['said']:>6} "
+            f"{result['memory_mib']:>9} {result['memory_per_room_mib']:>9} {result['rooms_per_gb']:>9} "
+            f"{result['cpu_cores']:>7} {result['rooms_per_core'] or '-':>10}"
+        )
+        for error in result["errors"]:
+            print(f"  error: {error}")
+
+
+if __name__ == "__main__":
+    main()
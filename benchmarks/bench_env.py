@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+# Placeholder credentials and settings for the offline benchmarks; nothing talks to LiveKit, OpenAI or Tavus.
+BENCH_ENV = {
+    "LIVEKIT_URL": "ws://127.0.0.1:7880",
+    "LIVEKIT_API_KEY": "bench-key",
+    "LIVEKIT_API_SECRET": "bench-secret",
+    "AGENT_NAME": "bench-agent",
+    "OPENAI_API_KEY": "bench-openai-key",
+    "TAVUS_API_KEY": "bench-tavus-key",
+    "TAVUS_REPLICA_ID": "bench-replica",
+    "TAVUS_PERSONA_ID": "bench-persona",
+    "TTS_KEEPALIVE_INTERVAL": "0",
+    "AGENT_INGEST_MODE": "off",
+    "AGENT_LOAD_DIR": os.path.join(tempfile.gettempdir(), "bench-agent-load"),
+}
+
+
+def use_bench_env(**overrides: str) -> None:
+    # Call before importing the agent; variables already set in the environment win.
+    for name, value in {**BENCH_ENV, **overrides}.items():
+        os.environ.setdefault(name, value)
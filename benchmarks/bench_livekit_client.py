@@ -0,0 +1,92 @@
+"""Per-request overhead of a fresh LiveKitAPI client vs the shared app client.
+
+Run with ``python -m benchmarks.bench_livekit_client``.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from .fake_livekit import FakeLiveKitServer
+
+
+def _summary(label: str, samples: list[float], elapsed: float, connections: int) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return (
+        f"{label:<8} n={len(samples):<5} mean={statistics.mean(samples) * 1e3:7.3f}ms "
+        f"p50={statistics.median(samples) * 1e3:7.3f}ms p99={p99 * 1e3:7.3f}ms "
+        f"total={elapsed:6.3f}s connections={connections}"
+    )
+
+
+async def _fresh_client_send(room_name: str, text: str) -> None:
+    # Mirrors the previous behaviour: one LiveKitAPI per request, closed afterwards.
+    from livekit import api as livekit_api
+
+    from api.config import get_settings
+    from api.livekit_client import LiveKitClient
+    from api.livekit_send import _resolve_method, _resolve_service
+
+    settings = get_settings()
+    client = LiveKitClient(
+        livekit_api.LiveKitAPI(
+            settings.livekit_url,
+            settings.livekit_api_key,
+            settings.livekit_api_secret,
+        )
+    )
+    try:
+        method = _resolve_method(_resolve_service(client.api))
+        await method(livekit_api.SendDataRequest(room=room_name, data=text.encode("utf-8"), topic="tts"))
+    finally:
+        await client.aclose()
+
+
+async def _run(label: str, send, requests: int, concurrency: int, server: FakeLiveKitServer) -> str:
+    server.stats.connections.clear()
+    samples: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await send(f"room-{index % 16}", "benchmark text")
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return _summary(label, samples, time.perf_counter() - started, len(server.stats.connections))
+
+
+async def main(requests: int, concurrency: int, latency: float) -> None:
+    server = FakeLiveKitServer(latency=latency)
+    await server.start()
+    os.environ["LIVEKIT_URL"] = server.url
+    os.environ.setdefault("LIVEKIT_API_KEY", "bench-key")
+    os.environ.setdefault("LIVEKIT_API_SECRET", "bench-secret-bench-secret-bench-secret")
+    os.environ.setdefault("AGENT_NAME", "bench-agent")
+
+    from api.livekit_client import close_livekit_client, start_livekit_client
+    from api.livekit_send import send_text_to_room
+
+    try:
+        print(await _run("before", _fresh_client_send, requests, concurrency, server))
+        await start_livekit_client()
+        try:
+            print(await _run("after", send_text_to_room, requests, concurrency, server))
+        finally:
+            await close_livekit_client()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0, help="injected server latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency))
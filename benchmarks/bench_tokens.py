@@ -0,0 +1,81 @@
+"""Token minting throughput: livekit AccessToken vs TokenMinter vs batched minting.
+
+Run with ``python -m benchmarks.bench_tokens``.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("LIVEKIT_URL", "ws://localhost:7880")
+os.environ.setdefault("LIVEKIT_API_KEY", "bench-key")
+os.environ.setdefault("LIVEKIT_API_SECRET", "bench-secret-bench-secret-bench-secret")
+os.environ.setdefault("AGENT_NAME", "bench-agent")
+
+
+def _report(label: str, count: int, elapsed: float) -> None:
+    print(f"{label:<22} {count:>7} tokens {elapsed:7.3f}s {count / elapsed:>10.0f} tokens/s")
+
+
+def _access_token(api_key: str, api_secret: str, room_name: str, identity: str) -> str:
+    from livekit import api
+
+    return (
+        api.AccessToken(api_key, api_secret)
+        .with_identity(identity)
+        .with_grants(
+            api.VideoGrants(
+                room_join=True,
+                room=room_name,
+                can_publish=True,
+                can_subscribe=True,
+                can_publish_data=True,
+            )
+        )
+        .to_jwt()
+    )
+
+
+def _verify(api_key: str, api_secret: str, token: str, room_name: str, identity: str) -> None:
+    from livekit import api
+
+    claims = api.TokenVerifier(api_key, api_secret).verify(token)
+    assert claims.identity == identity, claims
+    assert claims.video.room == room_name and claims.video.room_join, claims
+
+
+async def main(count: int, batch: int) -> None:
+    from api.config import get_settings
+    from api.livekit_tokens import close_token_executor, get_token_minter, mint_tokens
+
+    settings = get_settings()
+    minter = get_token_minter()
+    _verify(settings.livekit_api_key, settings.livekit_api_secret, minter.mint("room-0", "user-0"), "room-0", "user-0")
+
+    started = time.perf_counter()
+    for index in range(count):
+        _access_token(settings.livekit_api_key, settings.livekit_api_secret, "room-0", f"user-{index}")
+    _report("AccessToken", count, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for index in range(count):
+        minter.mint("room-0", f"user-{index}")
+    _report("TokenMinter.mint", count, time.perf_counter() - started)
+
+    pairs = [(f"room-{index % 64}", f"user-{index}") for index in range(batch)]
+    # The first offloaded batch pays for spawning the worker pool.
+    await mint_tokens(pairs)
+    started = time.perf_counter()
+    tokens = await mint_tokens(pairs)
+    _report(f"mint_tokens(batch={batch})", len(tokens), time.perf_counter() - started)
+    _verify(settings.livekit_api_key, settings.livekit_api_secret, tokens[-1], *pairs[-1])
+    close_token_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=50000)
+    args = parser.parse_args()
+    asyncio.run(main(args.count, args.batch))
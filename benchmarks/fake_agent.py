@@ -0,0 +1,263 @@
+import asyncio
+import threading
+import time
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable
+
+from livekit import rtc
+
+import agent.main as agent_main
+
+FRAME_MS = 20
+
+
+class Recorder:
+    # Shared by every room in the process; rooms on different threads record concurrently.
+    def __init__(self) -> None:
+        self.sent = 0
+        self.said = 0
+        self.completed = 0
+        self.interrupted = 0
+        self.interrupt_calls = 0
+        self.receive_to_say: list[float] = []
+        self.say_to_first_frame: list[float] = []
+        self.receive_to_first_frame: list[float] = []
+        self._pending: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, delta: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def packet_sent(self, text: str) -> None:
+        with self._lock:
+            self.sent += 1
+            self._pending[text] = time.perf_counter()
+
+    def say_started(self, text: Any, said_at: float) -> float | None:
+        # Texts are unique per run, so the spoken text identifies the packet that asked for it.
+        with self._lock:
+            self.said += 1
+            sent_at = self._pending.pop(text, None) if isinstance(text, str) else None
+            if sent_at is not None:
+                self.receive_to_say.append(said_at - sent_at)
+        return sent_at
+
+    def first_frame(self, sent_at: float | None, said_at: float, now: float) -> None:
+        with self._lock:
+            self.say_to_first_frame.append(now - said_at)
+            if sent_at is not None:
+                self.receive_to_first_frame.append(now - sent_at)
+
+
+@dataclass
+class _SynthesizedAudio:
+    frame: rtc.AudioFrame
+
+
+class FakeTTS:
+    def __init__(
+        self,
+        first_byte_delay: float = 0.2,
+        frame_rate: float = 200.0,
+        ms_per_char: float = 60.0,
+        sample_rate: int = 24000,
+    ) -> None:
+        # frame_rate is how many 20 ms frames the provider delivers per second; 50 is real time.
+        self.first_byte_delay = first_byte_delay
+        self.frame_rate = frame_rate
+        self.ms_per_char = ms_per_char
+        self.sample_rate = sample_rate
+        self.samples_per_frame = sample_rate * FRAME_MS // 1000
+        self._silence = bytes(self.samples_per_frame * 2)
+
+    def synthesize(self, text: str) -> "_FakeSynthesis":
+        return _FakeSynthesis(self, text)
+
+    def frame(self) -> rtc.AudioFrame:
+        return rtc.AudioFrame(
+            data=self._silence,
+            sample_rate=self.sample_rate,
+            num_channels=1,
+            samples_per_channel=self.samples_per_frame,
+        )
+
+
+class _FakeSynthesis:
+    def __init__(self, tts: FakeTTS, text: str) -> None:
+        self.tts = tts
+        self.text = text
+
+    async def __aenter__(self) -> "_FakeSynthesis":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+    def __aiter__(self) -> AsyncIterator[_SynthesizedAudio]:
+        return self._events()
+
+    async def _events(self) -> AsyncIterator[_SynthesizedAudio]:
+        await asyncio.sleep(self.tts.first_byte_delay)
+        frames = max(1, round(len(self.text) * self.tts.ms_per_char / FRAME_MS))
+        interval = 1.0 / self.tts.frame_rate if self.tts.frame_rate > 0 else 0.0
+        for index in range(frames):
+            if index and interval:
+                await asyncio.sleep(interval)
+            yield _SynthesizedAudio(self.tts.frame())
+
+
+class FakeAvatar:
+    def __init__(self, start_delay: float = 0.0) -> None:
+        self.start_delay = start_delay
+
+    async def start(self, **kwargs: Any) -> None:
+        await asyncio.sleep(self.start_delay)
+
+
+class FakeAgent:
+    def __init__(self, **kwargs: Any) -> None:
+        self.instructions = kwargs.get("instructions")
+
+
+class FakeSpeechHandle:
+    def __init__(self, task: "asyncio.Task[None]") -> None:
+        self.task = task
+
+    @property
+    def done(self) -> bool:
+        return self.task.done()
+
+    async def wait_for_playout(self) -> None:
+        # Like the real handle, an interrupted playout returns instead of raising.
+        await asyncio.wait({self.task})
+
+
+class FakeAgentSession:
+    def __init__(self, tts: Any = None, **kwargs: Any) -> None:
+        self.tts = tts
+        self.recorder: Recorder | None = None
+        self._current: FakeSpeechHandle | None = None
+
+    async def start(self, agent: Any = None, room: Any = None, record: bool = False) -> None:
+        self.recorder = getattr(room, "recorder", None)
+
+    def say(self, text: Any, audio: AsyncIterator[rtc.AudioFrame] | None = None) -> FakeSpeechHandle:
+        said_at = time.perf_counter()
+        sent_at = self.recorder.say_started(text, said_at) if self.recorder is not None else None
+        self._current = FakeSpeechHandle(asyncio.create_task(self._playout(audio, sent_at, said_at)))
+        return self._current
+
+    async def _playout(
+        self,
+        audio: AsyncIterator[rtc.AudioFrame] | None,
+        sent_at: float | None,
+        said_at: float,
+    ) -> None:
+        recorder = self.recorder
+        if audio is None:
+            return
+        first = True
+        try:
+            async with aclosing(audio) as frames:
+                async for frame in frames:
+                    if first and recorder is not None:
+                        recorder.first_frame(sent_at, said_at, time.perf_counter())
+                    first = False
+                    # The room's audio source plays frames out in real time.
+                    await asyncio.sleep(frame.samples_per_channel / frame.sample_rate)
+        except asyncio.CancelledError:
+            if recorder is not None:
+                recorder.add("interrupted")
+            raise
+        if recorder is not None:
+            recorder.add("completed")
+
+    def interrupt(self) -> None:
+        if self.recorder is not None:
+            self.recorder.add("interrupt_calls")
+        if self._current is not None and not self._current.done:
+            self._current.task.cancel()
+
+
+@dataclass
+class FakeDataPacket:
+    data: bytes
+    topic: str | None = None
+
+
+class FakeLocalParticipant:
+    def __init__(self, identity: str) -> None:
+        self.identity = identity
+        self.attributes: dict[str, str] = {}
+
+    async def set_attributes(self, attributes: dict[str, str]) -> None:
+        self.attributes.update(attributes)
+
+
+class FakeRoom:
+    def __init__(self, name: str, recorder: Recorder) -> None:
+        self.name = name
+        self.recorder = recorder
+        self.local_participant = FakeLocalParticipant(f"agent-{name}")
+        self.text_stream_handlers: dict[str, Callable[..., Any]] = {}
+        self._handlers: dict[str, list[Callable[..., Any]]] = {}
+        self.joined = asyncio.Event()
+        self._disconnected = asyncio.Event()
+
+    def on(self, event: str, handler: Callable[..., Any]) -> Callable[..., Any]:
+        self._handlers.setdefault(event, []).append(handler)
+        return handler
+
+    def register_text_stream_handler(self, topic: str, handler: Callable[..., Any]) -> None:
+        self.text_stream_handlers[topic] = handler
+
+    def emit(self, event: str, *args: Any) -> None:
+        for handler in self._handlers.get(event, ()):
+            handler(*args)
+
+    def send_packet(self, data: bytes, topic: str | None = "tts") -> None:
+        self.emit("data_received", FakeDataPacket(data, topic))
+
+    async def wait_for_disconnect(self) -> None:
+        # The entrypoint only waits for disconnect once startup has finished.
+        self.joined.set()
+        await self._disconnected.wait()
+
+    def disconnect(self) -> None:
+        self._disconnected.set()
+
+
+@dataclass
+class FakeJobProcess:
+    userdata: dict[str, Any] = field(default_factory=dict)
+
+
+class FakeJobContext:
+    def __init__(self, room: FakeRoom, userdata: dict[str, Any], connect_delay: float = 0.0) -> None:
+        self.room = room
+        self.proc = FakeJobProcess(userdata)
+        self.connect_delay = connect_delay
+
+    async def connect(self) -> None:
+        await asyncio.sleep(self.connect_delay)
+
+
+async def wait_joined(room: FakeRoom, job: "asyncio.Task[None]", timeout: float) -> None:
+    joined = asyncio.create_task(room.joined.wait())
+    done, _ = await asyncio.wait({joined, job}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    joined.cancel()
+    if job in done:
+        # The entrypoint returned or raised before it finished starting up.
+        job.result()
+        raise RuntimeError(f"entrypoint for {room.name} exited during startup")
+    if not done:
+        raise TimeoutError(f"{room.name} did not finish startup within {timeout:g}s")
+
+
+def install_fakes(avatar_start_delay: float = 0.0) -> None:
+    # entrypoint builds the agent session and avatar itself; swap them for the fakes.
+    agent_main.AgentSession = FakeAgentSession
+    agent_main.Agent = FakeAgent
+    agent_main.build_avatar = lambda settings: FakeAvatar(avatar_start_delay)
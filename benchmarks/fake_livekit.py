@@ -0,0 +1,82 @@
+import asyncio
+import json
+import logging
+import random
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FakeLiveKitStats:
+    requests: dict[str, int] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+    connections: set[int] = field(default_factory=set)
+
+    def as_dict(self) -> dict:
+        return {"requests": dict(self.requests), "errors": dict(self.errors), "connections": len(self.connections)}
+
+
+class FakeLiveKitServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        method_latency: dict[str, float] | None = None,
+        method_error_rate: dict[str, float] | None = None,
+    ) -> None:
+        # Per-method overrides are keyed by Twirp method name, e.g. "SendData" or "CreateDispatch".
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.method_latency = method_latency or {}
+        self.method_error_rate = method_error_rate or {}
+        self.stats = FakeLiveKitStats()
+        self._random = random.Random()
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        name = f"{request.match_info['service']}/{request.match_info['method']}"
+        self.stats.requests[name] = self.stats.requests.get(name, 0) + 1
+        if request.transport is not None:
+            self.stats.connections.add(id(request.transport))
+        await request.read()
+        method = request.match_info["method"]
+        latency = self.method_latency.get(method, self.latency)
+        if self.jitter:
+            latency = max(0.0, latency + self._random.uniform(-self.jitter, self.jitter))
+        if latency:
+            await asyncio.sleep(latency)
+        if self._random.random() < self.method_error_rate.get(method, self.error_rate):
+            self.stats.errors[name] = self.stats.errors.get(name, 0) + 1
+            body = json.dumps({"code": "unavailable", "msg": "injected failure"})
+            return web.Response(status=503, text=body, content_type="application/json")
+        # An empty body decodes as the default protobuf response message.
+        return web.Response(body=b"", content_type="application/protobuf")
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post("/twirp/{service}/{method}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self._runner.addresses:
+            self.port = self._runner.addresses[0][1]
+        logger.info("fake LiveKit listening on %s", self.url)
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,278 @@
+"""Replay captured API traffic against an API instance with its original timing.
+
+Run with ``python -m benchmarks.replay_capture /var/lib/api-capture --url http://127.0.0.1:8000 --speed 4``.
+
+Reads the JSONL files the API writes when ``CAPTURE_DIR`` is set and re-issues
+every event at its original offset divided by ``--speed``. Each room's events run
+in order: a request starts at its scheduled time or when the previous request for
+the same room finishes, whichever is later. Captured ``session`` events create new
+sessions, and later events for that room go to the new room name. Sessions created
+with an idempotency key are replayed with a key derived from it, so repeated requests
+are repeated against the same new session. Rooms that were created before the capture
+started get a session on first use. Texts that were not captured
+(``CAPTURE_TEXT=false``) are replaced with filler of the captured length.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator
+
+import aiohttp
+
+from api.capture import capture_files
+
+FILLER = "Replayed speak text keeps the captured length. "
+BROADCAST_LANE = "\0broadcast"
+
+
+def load_events(paths: list[str]) -> list[dict[str, Any]]:
+    files: list[str] = []
+    for path in paths:
+        files.extend(capture_files(path) if os.path.isdir(path) else [path])
+    events = []
+    for path in files:
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line of a file that was being written may be cut short.
+                    continue
+                if isinstance(event, dict) and isinstance(event.get("ts"), (int, float)):
+                    events.append(event)
+    # Files from several workers interleave; a stable sort keeps each file's order for equal stamps.
+    events.sort(key=lambda event: event["ts"])
+    return events
+
+
+def _filler(chars: int) -> str:
+    chars = max(1, chars)
+    return (FILLER * (chars // len(FILLER) + 1))[:chars].strip() or "."
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _summary(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "p50_ms": round(_percentile(ordered, 0.50) * 1e3, 2),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1e3, 2),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1e3, 2),
+        "max_ms": round(ordered[-1] * 1e3, 2),
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@dataclass
+class EventStats:
+    statuses: dict[str, int] = field(default_factory=dict)
+    latencies: list[float] = field(default_factory=list)
+
+    def record(self, status: str, latency: float) -> None:
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.latencies.append(latency)
+
+
+class Replayer:
+    def __init__(self, session: aiohttp.ClientSession, base_url: str, args: argparse.Namespace) -> None:
+        self.session = session
+        self.base_url = base_url
+        self.speed = args.speed
+        self.create_missing = not args.no_create_missing
+        self.rooms: dict[str, str] = {}
+        # Keys from an earlier replay would otherwise return that run's sessions.
+        self.run_id = uuid.uuid4().hex[:8]
+        self.stats: dict[str, EventStats] = {}
+        self.lateness: list[float] = []
+
+    async def _request(self, kind: str, method: str, path: str, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        stats = self.stats.setdefault(kind, EventStats())
+        try:
+            async with self.session.request(method, self.base_url + path, **kwargs) as response:
+                body = await response.read()
+                stats.record(str(response.status), time.perf_counter() - started)
+                return json.loads(body) if response.status == 200 else None
+        except Exception as exc:
+            stats.record(f"exception:{type(exc).__name__}", time.perf_counter() - started)
+            return None
+
+    async def _create_room(self, original: str | None, kind: str, key: str | None = None) -> str | None:
+        headers = {"Idempotency-Key": f"replay-{self.run_id}-{key}"} if key else None
+        body = await self._request(kind, "POST", "/session", headers=headers)
+        if body is None:
+            return None
+        if original is not None:
+            self.rooms[original] = body["roomName"]
+        return body["roomName"]
+
+    async def _room(self, original: str) -> str:
+        room = self.rooms.get(original)
+        if room is None and self.create_missing:
+            room = await self._create_room(original, "session_implicit")
+        return room or original
+
+    def _text(self, event: dict[str, Any]) -> str:
+        text = event.get("text")
+        if isinstance(text, str) and text:
+            return text
+        return _filler(event.get("chars", 0))
+
+    async def _stream_body(self, text: str, fragments: int, duration: float) -> AsyncIterator[bytes]:
+        # Spread the body over the captured duration, as the original producer did.
+        pieces = max(1, fragments)
+        size = max(1, math.ceil(len(text) / pieces))
+        delay = duration / self.speed / pieces
+        for start in range(0, len(text), size):
+            if start and delay > 0:
+                await asyncio.sleep(delay)
+            yield text[start : start + size].encode("utf-8")
+
+    async def _issue(self, event: dict[str, Any]) -> None:
+        kind = event.get("event")
+        if kind == "session":
+            label = "session_repeat" if event.get("repeat") else "session"
+            await self._create_room(event.get("room"), label, event.get("key"))
+        elif kind == "speak":
+            room = await self._room(event["room"])
+            body = {"text": self._text(event), "policy": event.get("policy")}
+            body.update((key, event[key]) for key in ("model", "voice") if event.get(key))
+            await self._request("speak", "POST", f"/rooms/{room}/speak", json=body)
+        elif kind == "speak_stream":
+            room = await self._room(event["room"])
+            body = self._stream_body(self._text(event), event.get("fragments", 1), event.get("duration", 0.0))
+            params = {key: event[key] for key in ("policy", "model", "voice") if event.get(key)} or None
+            await self._request("speak_stream", "POST", f"/rooms/{room}/speak/stream", params=params, data=body)
+        elif kind == "broadcast":
+            texts = event.get("texts") or [None] * len(event["rooms"])
+            messages = [
+                {"room": self.rooms.get(room, room), "text": text or _filler(chars)}
+                for room, chars, text in zip(event["rooms"], event["chars"], texts)
+            ]
+            await self._request("broadcast", "POST", "/rooms/speak", json={"messages": messages})
+
+    async def _lane(self, events: list[dict[str, Any]], first_ts: float, started: float) -> None:
+        for event in events:
+            scheduled = started + (event["ts"] - first_ts) / self.speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.lateness.append(max(0.0, time.perf_counter() - scheduled))
+            await self._issue(event)
+
+    async def run(self, events: list[dict[str, Any]]) -> float:
+        lanes: dict[str, list[dict[str, Any]]] = {}
+        for index, event in enumerate(events):
+            if event.get("event") == "broadcast":
+                key = BROADCAST_LANE
+            else:
+                # Failed session creations have no room and do not wait for each other.
+                key = str(event["room"]) if event.get("room") else f"\0event-{index}"
+            lanes.setdefault(key, []).append(event)
+        started = time.perf_counter() + 0.1
+        await asyncio.gather(*(self._lane(lane, events[0]["ts"], started) for lane in lanes.values()))
+        return time.perf_counter() - started
+
+
+def describe(events: list[dict[str, Any]]) -> dict:
+    counts: dict[str, int] = {}
+    per_second: dict[int, int] = {}
+    for event in events:
+        counts[event.get("event", "?")] = counts.get(event.get("event", "?"), 0) + 1
+        per_second[int(event["ts"])] = per_second.get(int(event["ts"]), 0) + 1
+    span = events[-1]["ts"] - events[0]["ts"] if events else 0.0
+    return {
+        "events": len(events),
+        "by_event": counts,
+        "rooms": len({event["room"] for event in events if event.get("room")}),
+        "span_s": round(span, 3),
+        "peak_events_per_second": max(per_second.values(), default=0),
+    }
+
+
+async def replay(events: list[dict[str, Any]], args: argparse.Namespace) -> dict:
+    connector = aiohttp.TCPConnector(limit=args.max_connections)
+    timeout = aiohttp.ClientTimeout(total=args.request_timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        replayer = Replayer(session, args.url.rstrip("/"), args)
+        elapsed = await replayer.run(events)
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "lateness": _summary(replayer.lateness),
+        "events": {
+            kind: {"statuses": dict(sorted(stats.statuses.items())), **_summary(stats.latencies)}
+            for kind, stats in replayer.stats.items()
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="capture directories or JSONL files")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression; 4 replays 4x faster")
+    parser.add_argument("--limit", type=int, default=0, help="replay only the first N events")
+    parser.add_argument("--no-create-missing", action="store_true", help="send to unknown rooms by original name")
+    parser.add_argument("--max-connections", type=int, default=256)
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    parser.add_argument("--dry-run", action="store_true", help="describe the capture without sending anything")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        raise SystemExit("--speed must be positive")
+
+    events = load_events(args.paths)
+    if args.limit > 0:
+        events = events[: args.limit]
+    if not events:
+        raise SystemExit("no captured events found")
+    capture = describe(events)
+    print(
+        f"capture: {capture['events']} events over {capture['span_s']}s, {capture['rooms']} rooms, "
+        f"peak {capture['peak_events_per_second']}/s {capture['by_event']}"
+    )
+    if args.dry_run:
+        return
+
+    results = asyncio.run(replay(events, args))
+    print(f"replayed in {results['elapsed_s']}s at {args.speed:g}x, lateness {results['lateness']}")
+    for kind, row in results["events"].items():
+        print(f"{kind:<18} {row}")
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "args": vars(args),
+            },
+            "capture": capture,
+            **results,
+        }
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
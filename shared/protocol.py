@@ -0,0 +1,219 @@
+import json
+import os
+import struct
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+# Binary speak frames start with a byte that can never begin a UTF-8 string, so they
+# are told apart from legacy plain-text/JSON payloads by a single comparison.
+MAGIC = 0xA5
+VERSION = 1
+
+# magic, version, flags, message id, sequence, chunk index, chunk total, options length
+HEADER = struct.Struct("<BBBQIHHH")
+MAX_PACKET_BYTES = 14 * 1024
+
+POLICY_MASK = 0x03
+# Stream fragments share the stream's message id and use the sequence number as the
+# fragment index; the last fragment carries FLAG_END.
+FLAG_STREAM = 0x04
+FLAG_END = 0x08
+POLICIES = (None, "interrupt", "enqueue", "coalesce")
+_POLICY_BITS = {name: index for index, name in enumerate(POLICIES) if name is not None}
+
+REASSEMBLY_TIMEOUT = 10.0
+MAX_PENDING_MESSAGES = 64
+MAX_RECENT_IDS = 1024
+
+
+@dataclass(slots=True)
+class SpeakMessage:
+    text: str
+    message_id: int = 0
+    seq: int = 0
+    policy: str | None = None
+    options: dict[str, Any] = field(default_factory=dict)
+    stream: bool = False
+    end: bool = False
+
+
+def new_message_id() -> int:
+    return int.from_bytes(os.urandom(8), "little")
+
+
+def encode_speak(
+    text: str,
+    *,
+    seq: int = 0,
+    policy: str | None = None,
+    options: dict[str, Any] | None = None,
+    message_id: int | None = None,
+    stream: bool = False,
+    end: bool = False,
+    max_packet_bytes: int = MAX_PACKET_BYTES,
+) -> list[bytes]:
+    message_id = new_message_id() if message_id is None else message_id
+    flags = _POLICY_BITS.get(policy, 0) if policy else 0
+    if stream:
+        flags |= FLAG_STREAM | (FLAG_END if end else 0)
+    options_bytes = json.dumps(options, separators=(",", ":")).encode("utf-8") if options else b""
+    body = text.encode("utf-8")
+    first_room = max_packet_bytes - HEADER.size - len(options_bytes)
+    room = max_packet_bytes - HEADER.size
+    if first_room <= 0:
+        raise ValueError("speak options do not fit in one packet")
+    # Chunks are cut on byte boundaries; the receiver decodes only the reassembled body.
+    parts = [body[:first_room]]
+    parts.extend(body[start : start + room] for start in range(first_room, len(body), room))
+    total = len(parts)
+    if total > 0xFFFF:
+        raise ValueError("speak text is too large")
+    packets = []
+    for index, part in enumerate(parts):
+        extra = options_bytes if index == 0 else b""
+        header = HEADER.pack(MAGIC, VERSION, flags, message_id, seq & 0xFFFFFFFF, index, total, len(extra))
+        packets.append(header + extra + part)
+    return packets
+
+
+def _decode_legacy(payload: bytes | str) -> tuple[SpeakMessage | None, bool]:
+    if isinstance(payload, bytes):
+        try:
+            payload = payload.decode("utf-8")
+        except UnicodeDecodeError:
+            return None, False
+    payload = payload.strip()
+    if not payload:
+        return None, False
+    # Only payloads that look like JSON pay for json.loads.
+    if payload[0] not in '{"':
+        return SpeakMessage(text=payload), False
+    try:
+        data = json.loads(payload)
+    except json.JSONDecodeError:
+        return SpeakMessage(text=payload), False
+    if isinstance(data, dict):
+        text = data.get("text")
+        if not isinstance(text, str):
+            return None, False
+        policy = data.get("policy")
+        options = {key: value for key, value in data.items() if key not in ("type", "text", "policy")}
+        message = SpeakMessage(text=text, policy=policy if isinstance(policy, str) else None, options=options)
+        return message, data.get("type") == "speak"
+    if isinstance(data, str):
+        return SpeakMessage(text=data), False
+    return None, False
+
+
+@dataclass
+class _Partial:
+    total: int
+    seq: int
+    flags: int
+    created_at: float
+    options: bytes = b""
+    chunks: dict[int, bytes] = field(default_factory=dict)
+
+
+@dataclass
+class DecoderStats:
+    messages: int = 0
+    legacy: int = 0
+    duplicates: int = 0
+    chunks: int = 0
+    expired: int = 0
+    malformed: int = 0
+
+
+class SpeakDecoder:
+    def __init__(self) -> None:
+        self.stats = DecoderStats()
+        self._pending: OrderedDict[tuple[int, int], _Partial] = OrderedDict()
+        self._recent: OrderedDict[tuple[int, int], None] = OrderedDict()
+
+    def decode(self, payload: bytes | str | None, topic: str | None = None) -> SpeakMessage | None:
+        if payload is None:
+            return None
+        if isinstance(payload, (bytes, bytearray, memoryview)) and payload and payload[0] == MAGIC:
+            return self._decode_frame(bytes(payload))
+        message, is_speak_type = _decode_legacy(payload)
+        if message is None or not message.text:
+            return None
+        if topic != "tts" and not is_speak_type:
+            return None
+        self.stats.legacy += 1
+        return message
+
+    def _remember(self, key: tuple[int, int]) -> None:
+        self._recent[key] = None
+        if len(self._recent) > MAX_RECENT_IDS:
+            self._recent.popitem(last=False)
+
+    def _expire(self, now: float) -> None:
+        while self._pending:
+            key, partial = next(iter(self._pending.items()))
+            if now - partial.created_at < REASSEMBLY_TIMEOUT and len(self._pending) <= MAX_PENDING_MESSAGES:
+                break
+            del self._pending[key]
+            self.stats.expired += 1
+
+    def _decode_frame(self, payload: bytes) -> SpeakMessage | None:
+        if len(payload) < HEADER.size:
+            self.stats.malformed += 1
+            return None
+        _, version, flags, message_id, seq, index, total, options_len = HEADER.unpack_from(payload)
+        if version != VERSION or index >= total:
+            self.stats.malformed += 1
+            return None
+        key = (message_id, seq)
+        if key in self._recent:
+            self.stats.duplicates += 1
+            return None
+        if options_len:
+            body_start = HEADER.size + options_len
+            options = payload[HEADER.size : body_start]
+            body = payload[body_start:]
+        else:
+            options = b""
+            body = payload[HEADER.size :]
+
+        if total > 1:
+            self.stats.chunks += 1
+            now = time.monotonic()
+            self._expire(now)
+            partial = self._pending.get(key)
+            if partial is None:
+                partial = self._pending[key] = _Partial(total=total, seq=seq, flags=flags, created_at=now)
+            if index in partial.chunks:
+                self.stats.duplicates += 1
+                return None
+            partial.chunks[index] = body
+            if options:
+                partial.options = options
+            if len(partial.chunks) < partial.total:
+                return None
+            del self._pending[key]
+            body = b"".join(partial.chunks[i] for i in range(partial.total))
+            options = partial.options
+
+        self._remember(key)
+        try:
+            text = body.decode("utf-8")
+            decoded_options = json.loads(options) if options else {}
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            self.stats.malformed += 1
+            return None
+        if not isinstance(decoded_options, dict):
+            decoded_options = {}
+        self.stats.messages += 1
+        return SpeakMessage(
+            text,
+            message_id,
+            seq,
+            POLICIES[flags & POLICY_MASK],
+            decoded_options,
+            bool(flags & FLAG_STREAM),
+            bool(flags & FLAG_END),
+        )
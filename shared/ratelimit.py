@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+MAX_TRACKED_KEYS = 10_000
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def wait_time(self, cost: float = 1.0) -> float:
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+@dataclass
+class LimiterStats:
+    allowed: int = 0
+    limited_key: int = 0
+    limited_global: int = 0
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        global_rate: float = 0.0,
+        global_burst: float = 0.0,
+        max_keys: int = MAX_TRACKED_KEYS,
+    ) -> None:
+        # A rate of 0 disables that scope.
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.stats = LimiterStats()
+        now = time.monotonic()
+        self._global = TokenBucket(global_rate, global_burst, now) if global_rate > 0 else None
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        # Jobs in a shared worker process check the same limiter from different threads.
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0 or self._global is not None
+
+    def _bucket(self, key: str, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                # The least recently used key has been idle longest, so its bucket is full anyway.
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, now)
+        else:
+            self._buckets.move_to_end(key)
+            bucket.refill(now)
+        return bucket
+
+    def check(self, key: str, cost: float = 1.0, now: float | None = None) -> tuple[float, str | None]:
+        # Returns (retry_after, scope); tokens are only taken when every scope admits the request.
+        if not self.enabled:
+            return 0.0, None
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return self._check(key, cost, now)
+
+    def _check(self, key: str, cost: float, now: float) -> tuple[float, str | None]:
+        bucket = self._bucket(key, now) if self.rate > 0 else None
+        if bucket is not None:
+            wait = bucket.wait_time(cost)
+            if wait > 0:
+                self.stats.limited_key += 1
+                return wait, "room"
+        if self._global is not None:
+            self._global.refill(now)
+            wait = self._global.wait_time(cost)
+            if wait > 0:
+                self.stats.limited_global += 1
+                return wait, "global"
+            self._global.tokens -= cost
+        if bucket is not None:
+            bucket.tokens -= cost
+        self.stats.allowed += 1
+        return 0.0, None
@@ -0,0 +1,65 @@
+import re
+
+_SENTENCE_END = re.compile(r"(?:(?<=[.!?…。！？])|(?<=[.!?…。！？][\"')\]]))\s+")
+_CLAUSE_END = re.compile(r"(?<=[,;:—–])\s+")
+
+
+def _pack(parts: list[str], max_chars: int) -> list[str]:
+    chunks: list[str] = []
+    current = ""
+    for part in parts:
+        if current and len(current) + 1 + len(part) > max_chars:
+            chunks.append(current)
+            current = part
+        else:
+            current = f"{current} {part}" if current else part
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_long(sentence: str, max_chars: int) -> list[str]:
+    if len(sentence) <= max_chars:
+        return [sentence]
+    clauses = [clause for clause in _CLAUSE_END.split(sentence) if clause]
+    pieces: list[str] = []
+    for clause in clauses:
+        if len(clause) <= max_chars:
+            pieces.append(clause)
+        else:
+            pieces.extend(_pack(clause.split(), max_chars))
+    return _pack(pieces, max_chars)
+
+
+def split_text(text: str, max_chars: int) -> list[str]:
+    chunks: list[str] = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        if sentence:
+            chunks.extend(_split_long(sentence, max_chars))
+    return chunks
+
+
+class SentenceBuffer:
+    def __init__(self, max_chars: int) -> None:
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def push(self, text: str) -> list[str]:
+        self._buffer += text
+        parts = _SENTENCE_END.split(self._buffer)
+        # The last part has no boundary after it yet, so it may still grow.
+        self._buffer = parts.pop()
+        sentences = [part.strip() for part in parts if part.strip()]
+        while len(self._buffer) > self.max_chars:
+            cut = self._buffer.rfind(" ", 0, self.max_chars)
+            if cut <= 0:
+                cut = self.max_chars
+            head, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:].lstrip()
+            if head:
+                sentences.append(head)
+        return sentences
+
+    def flush(self) -> str:
+        tail, self._buffer = self._buffer.strip(), ""
+        return tail